@@ -1,13 +1,31 @@
+import asyncio
 import json
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from app.schemas.youtube import YouTubeURL, SegmentedTranscriptRequest, TranscriptRequest
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse, FileResponse
+from app.schemas.youtube import (
+    YouTubeURL,
+    SegmentedTranscriptRequest,
+    TranscriptRequest,
+    FrameJobRequest,
+    AnalyzeRequest,
+    BulkRequest,
+    TranscriptRangeRequest,
+)
 from app.utils.video_id import extract_video_id
-from app.services.chapter_service import generate_chapters, split_into_sentences
+from app.core.executors import run_io, run_model
+from app.core.responses import negotiated_response
+from app.services.chapter_service import outline_chapters, title_chapters
 from app.services.youtube_metadata import get_video_metadata
+from app.services.job_service import get_job
+from app.services.frame_service import start_frame_job, frame_file_path
+from app.services.pipeline_service import start_analysis_job
+from app.services.bulk_service import resolve_video_ids, iter_bulk_results
 from app.services.transcript_service import (
-    get_raw_transcript,
-    get_segmented_transcript,
+    get_transcript_async,
+    get_segmented_transcript_async,
+    get_transcript_range_async,
+    iter_segmented_transcript_async,
 )
 
 router = APIRouter(prefix="/youtube", tags=["YouTube"])
@@ -16,103 +34,196 @@ router = APIRouter(prefix="/youtube", tags=["YouTube"])
 # ─── Existing endpoints ─────────────────────────────────────────
 
 @router.post("/metadata")
-def fetch_metadata(body: YouTubeURL):
+async def fetch_metadata(body: YouTubeURL):
     try:
-        return get_video_metadata(str(body.url))
+        return await run_io(get_video_metadata, str(body.url))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/chapters")
-def fetch_chapters(body: TranscriptRequest):
+async def fetch_chapters(body: TranscriptRequest):
     segments = body.transcriptSegments
     metadata = body.metadata
 
-    segments = split_into_sentences(segments)
-    chapters = generate_chapters(segments, metadata)
+    # the embedding model needs a model slot; the LLM round trip must not hold one
+    outline = await run_model(
+        outline_chapters, segments, metadata, body.title_mode, body.target_chapters
+    )
+    chapters = await run_io(title_chapters, outline)
 
     return chapters
 
 @router.post("/transcript")
-def fetch_transcript(body: YouTubeURL):
+async def fetch_transcript(body: YouTubeURL, request: Request):
     video_id = extract_video_id(str(body.url))
     if not video_id:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
     try:
-        return {
+        transcript = await get_transcript_async(video_id)
+        payload = {
             "video_id": video_id,
-            "transcript": get_raw_transcript(video_id),
+            "transcript": await run_io(transcript.to_dicts, True),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # encoding/compressing a large transcript is CPU work; keep it off the loop
+    return await run_io(negotiated_response, request, payload)
+
 
 @router.post("/transcript/segmented")
-def fetch_segmented_transcript(body: SegmentedTranscriptRequest):
+async def fetch_segmented_transcript(body: SegmentedTranscriptRequest, request: Request):
     video_id = extract_video_id(str(body.url))
     if not video_id:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
     try:
-        return {
+        payload = {
             "video_id": video_id,
             "segment_seconds": body.segment_seconds,
-            "segments": get_segmented_transcript(video_id, body.segment_seconds),
+            "segments": await get_segmented_transcript_async(video_id, body.segment_seconds),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return await run_io(negotiated_response, request, payload)
+
+
+@router.post("/transcript/range")
+async def fetch_transcript_range(body: TranscriptRangeRequest, request: Request):
+    video_id = extract_video_id(str(body.url))
+    if not video_id:
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
+    if body.end <= body.start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+
+    try:
+        payload = {
+            "video_id": video_id,
+            "start": body.start,
+            "end": body.end,
+            **await get_transcript_range_async(video_id, body.start, body.end),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return await run_io(negotiated_response, request, payload)
+
+
+@router.post("/bulk")
+async def fetch_bulk(body: BulkRequest):
+    if not body.playlist_url and not body.urls:
+        raise HTTPException(status_code=400, detail="Provide playlist_url or urls")
+
+    try:
+        video_ids = await run_io(
+            resolve_video_ids,
+            str(body.playlist_url) if body.playlist_url else None,
+            [str(url) for url in body.urls],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def generate():
+        yield json.dumps({"type": "resolved", "count": len(video_ids)}) + "\n"
+
+        completed = 0
+        async for result in iter_bulk_results(
+            video_ids,
+            include_metadata=body.include_metadata,
+            include_transcript=body.include_transcript,
+            whisper_fallback=body.whisper_fallback,
+        ):
+            completed += 1
+            yield json.dumps(result) + "\n"
+
+        yield json.dumps({"type": "done", "count": completed}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 
 # ─── FIXED SSE STREAMING ENDPOINT ───────────────────────────────
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+
 def _sse_event(data: dict) -> str:
     return f"data: {json.dumps(data)}\n\n"
 
 
 @router.post("/transcript/segmented/stream")
-def stream_segmented_transcript(body: SegmentedTranscriptRequest):
+async def stream_segmented_transcript(body: SegmentedTranscriptRequest):
     video_id = extract_video_id(str(body.url))
     if not video_id:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
-    def generate():
-        try:
-            # 🔥 Start event (instant feedback)
-            yield _sse_event({
+    async def generate():
+        # 🔥 Start event (instant feedback)
+        yield _sse_event({
+            "type": "progress",
+            "message": "Starting transcript pipeline…",
+            "percent": 2
+        })
+
+        # progress is reported from executor threads; hand it to the event
+        # loop so each event is sent as soon as it happens
+        loop = asyncio.get_running_loop()
+        progress_queue: asyncio.Queue = asyncio.Queue()
+
+        def on_progress(message: str, percent: int):
+            loop.call_soon_threadsafe(progress_queue.put_nowait, {
                 "type": "progress",
-                "message": "Starting transcript pipeline…",
-                "percent": 2
+                "message": message,
+                "percent": percent
             })
 
-            # 🔥 KEY FIX: yield progress IMMEDIATELY (not buffer)
-            def on_progress(message: str, percent: int):
-                nonlocal progress_queue
-                progress_queue.append({
-                    "type": "progress",
-                    "message": message,
-                    "percent": percent
-                })
+        task = asyncio.create_task(get_transcript_async(video_id, on_progress=on_progress))
 
-            progress_queue = []
+        try:
+            while not task.done():
+                getter = asyncio.create_task(progress_queue.get())
+                done, _ = await asyncio.wait(
+                    {getter, task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter in done:
+                    yield _sse_event(getter.result())
+                else:
+                    getter.cancel()
 
-            # Run heavy function
-            segments = get_segmented_transcript(
-                video_id,
-                body.segment_seconds,
-                on_progress=on_progress,
-            )
+            while not progress_queue.empty():
+                yield _sse_event(progress_queue.get_nowait())
 
-            # 🔥 Stream progress events (NOT delayed now)
-            for event in progress_queue:
-                yield _sse_event(event)
+            transcript = task.result()
+            yield _sse_event({
+                "type": "progress",
+                "message": f"Merging {len(transcript)} segments into {body.segment_seconds}s windows…",
+                "percent": 95
+            })
+
+            # one event per merged window, sent as soon as it is ready
+            count = 0
+            async for segment in iter_segmented_transcript_async(
+                transcript, body.segment_seconds
+            ):
+                yield _sse_event({
+                    "type": "segment",
+                    "index": count,
+                    "segment": segment,
+                })
+                count += 1
 
             # Done event
             yield _sse_event({
                 "type": "done",
                 "video_id": video_id,
                 "segment_seconds": body.segment_seconds,
-                "segments": segments,
+                "count": count,
             })
 
         except Exception as e:
@@ -120,13 +231,124 @@ def stream_segmented_transcript(body: SegmentedTranscriptRequest):
                 "type": "error",
                 "detail": str(e)
             })
+        finally:
+            task.cancel()
 
     return StreamingResponse(
         generate(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
\ No newline at end of file
+        headers=SSE_HEADERS,
+    )
+
+
+# ─── Background jobs (frames, full analysis) ────────────────────
+
+def _get_job(job_id: str, kind: str):
+    job = get_job(job_id, kind=kind)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+JOB_POLL_SECONDS = 0.5
+JOB_KEEPALIVE_SECONDS = 15
+
+
+def _job_events_response(job):
+    async def generate():
+        index = 0
+        idle = 0.0
+        while True:
+            events, finished = job.events_since(index)
+            index += len(events)
+            for event in events:
+                yield _sse_event(event)
+
+            if finished:
+                return
+
+            if events:
+                idle = 0.0
+            elif idle >= JOB_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+
+            await asyncio.sleep(JOB_POLL_SECONDS)
+            idle += JOB_POLL_SECONDS
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+def _job_file_response(job, filename: str):
+    path = frame_file_path(job.work_dir, filename)
+    if job.status != "done" or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Frame not found")
+
+    return FileResponse(path, media_type="image/jpeg")
+
+
+@router.post("/frames", status_code=202)
+async def start_frames(body: FrameJobRequest):
+    video_id = extract_video_id(str(body.url))
+    if not video_id:
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
+
+    # job submission prunes expired job directories from disk
+    job = await run_io(
+        start_frame_job,
+        f"https://www.youtube.com/watch?v={video_id}",
+        mode=body.mode,
+        timestamps=body.timestamps,
+    )
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/frames/{job_id}")
+async def fetch_frame_job(job_id: str):
+    return _get_job(job_id, "frames").to_dict()
+
+
+@router.get("/frames/{job_id}/events")
+async def stream_frame_job(job_id: str):
+    return _job_events_response(_get_job(job_id, "frames"))
+
+
+@router.get("/frames/{job_id}/files/{filename}")
+async def fetch_frame_file(job_id: str, filename: str):
+    return _job_file_response(_get_job(job_id, "frames"), filename)
+
+
+@router.post("/analyze", status_code=202)
+async def start_analysis(body: AnalyzeRequest):
+    video_id = extract_video_id(str(body.url))
+    if not video_id:
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
+
+    job = await run_io(
+        start_analysis_job,
+        video_id,
+        mode=body.mode,
+        segment_seconds=body.segment_seconds,
+        title_mode=body.title_mode,
+        target_chapters=body.target_chapters,
+    )
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/analyze/{job_id}")
+async def fetch_analysis_job(job_id: str):
+    return _get_job(job_id, "analysis").to_dict()
+
+
+@router.get("/analyze/{job_id}/events")
+async def stream_analysis_job(job_id: str):
+    return _job_events_response(_get_job(job_id, "analysis"))
+
+
+@router.get("/analyze/{job_id}/files/{filename}")
+async def fetch_analysis_file(job_id: str, filename: str):
+    return _job_file_response(_get_job(job_id, "analysis"), filename)
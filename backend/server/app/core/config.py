@@ -1,2 +1,87 @@
+import os
+
 APP_NAME = "YouTube Processing API"
-DEFAULT_SEGMENT_SECONDS = 60
\ No newline at end of file
+DEFAULT_SEGMENT_SECONDS = 60
+
+TEMP_DIR = os.path.join(os.getcwd(), "temp")
+
+# Background jobs
+JOB_DIR = os.path.join(TEMP_DIR, "jobs")
+JOB_TTL_SECONDS = 60 * 60
+FRAME_JOB_CONCURRENCY = 1
+FRAME_MAX_TIMESTAMPS = 200         # each one is an ffmpeg seek into the stream
+
+# Metadata cache
+METADATA_CACHE_SIZE = 2048
+METADATA_CACHE_TTL = 6 * 60 * 60
+
+# Bulk (playlist) ingestion
+BULK_WORKERS = 8
+BULK_MAX_VIDEOS = 500
+
+# Executors: short blocking I/O (YouTube API, yt-dlp metadata, LLM calls)
+# and heavy model work (Whisper, embeddings) get separate thread pools so a
+# burst of one cannot starve the other.
+IO_WORKERS = 32
+MODEL_WORKERS = 2
+
+# Shared HTTP session for YouTube transcript fetches
+TRANSCRIPT_POOL_SIZE = IO_WORKERS
+TRANSCRIPT_RETRIES = 3
+TRANSCRIPT_BACKOFF = 0.5          # seconds, doubled per retry
+TRANSCRIPT_TIMEOUT = (5, 20)      # (connect, read) seconds
+
+# Parsed transcripts, reused by segmented/range requests for the same video
+TRANSCRIPT_CACHE_SIZE = 256
+TRANSCRIPT_CACHE_TTL = 6 * 60 * 60
+
+# Chapter pipeline stages per transcript (embeddings of a 5 h transcript are ~25 MB)
+ANALYSIS_CACHE_SIZE = 32
+ANALYSIS_CACHE_TTL = 60 * 60
+MAX_TARGET_CHAPTERS = 100         # largest target_chapters a request may ask for
+
+# Whisper tiers. A small multilingual model detects the language on the
+# first WHISPER_DETECT_SECONDS; confident English goes to the fast tier
+# (transcribe only), everything else to the standard tier (translate to
+# English). Output whose mean segment log-probability is below
+# WHISPER_MIN_LOGPROB is redone by the accurate tier.
+# Backend "auto" uses faster-whisper (CTranslate2) when it is installed.
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "auto")       # auto | openai | faster
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_DETECT_MODEL = os.getenv("WHISPER_DETECT_MODEL", "tiny")
+WHISPER_FAST_MODEL = os.getenv("WHISPER_FAST_MODEL", "base.en")
+WHISPER_STANDARD_MODEL = os.getenv("WHISPER_STANDARD_MODEL", "base")
+WHISPER_ACCURATE_MODEL = os.getenv("WHISPER_ACCURATE_MODEL", "small")
+WHISPER_DETECT_SECONDS = 30
+WHISPER_ENGLISH_CONFIDENCE = 0.7
+WHISPER_MIN_LOGPROB = -1.0
+WHISPER_NO_SPEECH = 0.6           # segments above this no-speech probability don't count
+
+# Voice activity detection before Whisper: only speech regions are
+# transcribed. Uses webrtcvad when installed, else a frame-energy detector.
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") != "0"
+VAD_FRAME_MS = 30
+VAD_AGGRESSIVENESS = 2            # webrtcvad mode, 0 (lenient) to 3
+VAD_ENERGY_DB = 12                # energy detector: dB above the noise floor
+VAD_MIN_SILENCE = 1.0             # seconds; shorter pauses stay in the audio
+VAD_MIN_SPEECH = 0.25             # seconds; shorter bursts are dropped
+VAD_PAD = 0.2                     # seconds kept around each speech region
+VAD_MIN_SKIP_RATIO = 0.05         # below this, transcribe the audio as is
+
+# Response encoding
+COMPRESSION_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Logging: JSON lines on stderr. Whisper's per-segment output is only
+# printed when debugging.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+WHISPER_VERBOSE = LOG_LEVEL.upper() == "DEBUG"
+
+# Per-request profiling (X-Profile: 1 or ?profile=1 with X-Admin-Token).
+# Disabled unless an admin token is configured.
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+PROFILE_DIR = os.path.join(TEMP_DIR, "profiles")
+PROFILE_INTERVAL = 0.005          # seconds between stack samples
+PROFILE_TTL_SECONDS = 24 * 60 * 60
+PROFILE_MAX_FILES = 200           # oldest are removed beyond this
@@ -0,0 +1,39 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from app.core.config import IO_WORKERS, MODEL_WORKERS
+from app.core.profiling import profiled
+
+T = TypeVar("T")
+
+io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+model_executor = ThreadPoolExecutor(max_workers=MODEL_WORKERS, thread_name_prefix="model")
+
+
+async def run_in(executor: Executor, fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call on `executor`, keeping the caller's contextvars
+    (and, for a profiled request, sampling the worker thread meanwhile)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, profiled(fn), *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+def submit(executor: Executor, fn: Callable[..., T], *args, **kwargs) -> "Future[T]":
+    """run_in for code already on a worker thread (background jobs), so
+    their model work still counts against the shared pools' limits."""
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, profiled(fn), *args, **kwargs)
+
+
+async def run_io(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Network-bound or otherwise short blocking work."""
+    return await run_in(io_executor, fn, *args, **kwargs)
+
+
+async def run_model(fn: Callable[..., T], *args, **kwargs) -> T:
+    """CPU/GPU-heavy model work: Whisper, embeddings."""
+    return await run_in(model_executor, fn, *args, **kwargs)
@@ -0,0 +1,63 @@
+import contextvars
+import json
+import logging
+import sys
+import time
+from typing import Optional
+
+from app.core.config import LOG_LEVEL
+
+# Correlation ids; executors copy contextvars, so worker-thread log lines
+# carry the id of the request or job that scheduled them.
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+job_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("job_id", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, ids, extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+
+        rid, jid = request_id.get(), job_id.get()
+        if rid:
+            entry["request_id"] = rid
+        if jid:
+            entry["job_id"] = jid
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level: str = LOG_LEVEL):
+    """Route the `app` loggers to stderr as JSON. Safe to call twice."""
+    logger = logging.getLogger("app")
+    logger.setLevel(level.upper())
+    if not any(getattr(h, "_app_json", False) for h in logger.handlers):
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        handler._app_json = True
+        logger.addHandler(handler)
+    logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
@@ -0,0 +1,239 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from app.core.log import get_logger
+from app.core.profiling import record_stage
+
+logger = get_logger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# seconds; pipeline stages range from sub-ms merges to multi-minute Whisper runs
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# =========================
+# METRIC TYPES
+# =========================
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = STAGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[idx] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), t[0]) for k, (c, t) in self._values.items()]
+
+        lines = []
+        for key, counts, total in items:
+            running = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                running += count
+                le = (("le", _format_value(float(bound))),)
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {running}")
+        return lines
+
+
+class CallbackMetric:
+    """Counter or gauge read from existing state when /metrics is scraped."""
+
+    def __init__(self, name: str, help: str, kind: str, collect: Callable[[], Dict[LabelKey, float]]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(k)} {_format_value(v)}"
+            for k, v in self.collect().items()
+        ]
+
+
+# =========================
+# REGISTRY
+# =========================
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name: str, help: str) -> Counter:
+    return _register(Counter(name, help))
+
+
+def histogram(name: str, help: str, buckets: Sequence[float] = STAGE_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, buckets))
+
+
+def register_callback(name: str, help: str, kind: str, collect: Callable[[], Dict[LabelKey, float]]):
+    _register(CallbackMetric(name, help, kind, collect))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# =========================
+# PIPELINE METRICS
+# =========================
+stage_seconds = histogram(
+    "pipeline_stage_seconds",
+    "Wall time of each pipeline stage.",
+)
+whisper_fallbacks = counter(
+    "whisper_fallbacks_total",
+    "Transcripts generated by Whisper because YouTube had none.",
+)
+llm_failures = counter(
+    "llm_failures_total",
+    "Chapter title requests to the LLM that failed.",
+)
+whisper_real_time_factor = histogram(
+    "whisper_real_time_factor",
+    "Transcription seconds per second of audio, by Whisper tier and model.",
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5),
+)
+whisper_audio_seconds = counter(
+    "whisper_audio_seconds_total",
+    "Seconds of audio transcribed, by Whisper tier.",
+)
+whisper_compute_seconds = counter(
+    "whisper_compute_seconds_total",
+    "Wall time spent transcribing, by Whisper tier.",
+)
+whisper_skipped_seconds = counter(
+    "whisper_vad_skipped_seconds_total",
+    "Seconds of audio left out of Whisper because VAD found no speech there.",
+)
+whisper_escalations = counter(
+    "whisper_escalations_total",
+    "Transcriptions redone by a larger model because confidence was low.",
+)
+# export 0 before the first event so rate() has a starting point
+whisper_fallbacks.inc(0)
+llm_failures.inc(0)
+
+_caches: Dict[str, object] = {}
+
+
+def register_cache(name: str, cache):
+    """Expose a TTLCache's hit/miss counters as cache_{hits,misses}_total."""
+    _caches[name] = cache
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """`with timed("embedding"): ...` (or `@timed(...)`) records into
+    pipeline_stage_seconds and the current request's Server-Timing, and
+    logs the duration at debug level."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stage_seconds.observe(seconds, stage=stage)
+        record_stage(stage, seconds)
+        logger.debug("stage finished", extra={"stage": stage, "duration_ms": round(seconds * 1000, 1)})
+
+
+register_callback(
+    "cache_hits_total",
+    "Cache lookups that returned a live entry.",
+    "counter",
+    lambda: {_label_key({"cache": name}): c.hits for name, c in list(_caches.items())},
+)
+register_callback(
+    "cache_misses_total",
+    "Cache lookups that missed or found an expired entry.",
+    "counter",
+    lambda: {_label_key({"cache": name}): c.misses for name, c in list(_caches.items())},
+)
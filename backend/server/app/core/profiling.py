@@ -0,0 +1,172 @@
+import contextvars
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+from app.core.config import PROFILE_DIR, PROFILE_INTERVAL, PROFILE_MAX_FILES, PROFILE_TTL_SECONDS
+
+
+# =========================
+# PER-REQUEST STAGE TIMERS
+# =========================
+class StageTimings:
+    """Seconds spent per stage during one request, summed across threads."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header (durations in ms)."""
+        with self._lock:
+            items = list(self.totals.items())
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in items)
+
+
+stage_timings: contextvars.ContextVar[Optional[StageTimings]] = contextvars.ContextVar(
+    "stage_timings", default=None
+)
+
+
+def record_stage(stage: str, seconds: float):
+    timings = stage_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+# =========================
+# SAMPLING PROFILER
+# =========================
+class SamplingProfiler:
+    """Samples the stacks of the threads doing one request's work.
+
+    Executor calls made on behalf of the request (run_in/submit and the
+    LLM title batches) register their thread while they run (see
+    `profiled`), so concurrent requests on the same pools do not show up in
+    each other's profiles. Output is the collapsed
+    stack format read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._threads: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def enter_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def exit_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] -= 1
+            if not self._threads[ident]:
+                del self._threads[ident]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples[_collapse(frame)] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+active_profiler: contextvars.ContextVar[Optional[SamplingProfiler]] = contextvars.ContextVar(
+    "active_profiler", default=None
+)
+
+
+def profiled(fn: Callable) -> Callable:
+    """Wrap fn so its thread is sampled if the caller's request is profiled."""
+    profiler = active_profiler.get()
+    if profiler is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        profiler.enter_thread()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.exit_thread()
+
+    return run
+
+
+# =========================
+# STORAGE
+# =========================
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    return os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+
+
+def _prune_profiles():
+    """Drop profiles older than PROFILE_TTL_SECONDS, then the oldest beyond
+    PROFILE_MAX_FILES."""
+    now = time.time()
+    entries = []
+    with os.scandir(PROFILE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".folded"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    continue
+
+    entries.sort(reverse=True)
+    for i, (mtime, path) in enumerate(entries):
+        if i >= PROFILE_MAX_FILES or now - mtime > PROFILE_TTL_SECONDS:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def save_profile(profile_id: str, profiler: SamplingProfiler):
+    """Stop sampling, write the profile and prune old ones. Blocking: run it
+    off the event loop."""
+    profiler.stop()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(profile_path(profile_id), "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+    _prune_profiles()
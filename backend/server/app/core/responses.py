@@ -0,0 +1,73 @@
+import gzip
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.config import COMPRESSION_MIN_BYTES, GZIP_LEVEL, BROTLI_QUALITY
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Parse an Accept / Accept-Encoding header into {token: q}."""
+    accepted = {}
+    for part in header.split(","):
+        token, *params = [p.strip() for p in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[token.lower()] = q
+    return accepted
+
+
+def encode_payload(payload: Any, accept: str = "") -> Tuple[bytes, str]:
+    """msgpack when the client asks for it (and msgpack is installed), else orjson."""
+    if msgpack is not None:
+        accepted = _accepted(accept)
+        if any(accepted.get(t, 0) > 0 for t in MSGPACK_TYPES):
+            return msgpack.packb(payload, use_bin_type=True), MSGPACK_TYPES[0]
+
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), "application/json"
+
+
+def compress(body: bytes, accept_encoding: str = "") -> Tuple[bytes, Optional[str]]:
+    """Brotli if accepted and installed, else gzip if accepted, else identity."""
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return body, None
+
+    accepted = _accepted(accept_encoding)
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if accepted.get("gzip", 0) > 0:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+
+def negotiated_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """Encode with orjson/msgpack and compress large bodies per the request headers."""
+    body, media_type = encode_payload(payload, request.headers.get("accept", ""))
+    body, encoding = compress(body, request.headers.get("accept-encoding", ""))
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    return Response(body, status_code=status_code, media_type=media_type, headers=headers)
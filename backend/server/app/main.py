@@ -1,10 +1,153 @@
-from fastapi import FastAPI
-from app.api.routes.youtube import router as youtube_router
+import hmac
+import os
+import time
+import uuid
+from typing import Callable
 
-app = FastAPI(title="YouTube Data API")
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse
+from app.core.config import PROFILE_ADMIN_TOKEN
+from app.core.log import elapsed_ms, get_logger, request_id, setup_logging
+
+# before the services are imported, so import-time log lines are JSON too
+setup_logging()
+
+from app.api.routes.youtube import router as youtube_router  # noqa: E402
+from app.core.executors import io_executor  # noqa: E402
+from app.core.metrics import render as render_metrics  # noqa: E402
+from app.core.profiling import (  # noqa: E402
+    SamplingProfiler,
+    StageTimings,
+    active_profiler,
+    profile_path,
+    save_profile,
+    stage_timings,
+)
+from app.utils.transcript_client import connection_stats  # noqa: E402
+
+app = FastAPI(title="YouTube Data API", default_response_class=ORJSONResponse)
+logger = get_logger("app.access")
 
 app.include_router(youtube_router)
 
+
+def _is_admin(request: Request) -> bool:
+    supplied = request.headers.get("x-admin-token") or ""
+    return bool(PROFILE_ADMIN_TOKEN) and hmac.compare_digest(supplied, PROFILE_ADMIN_TOKEN)
+
+
+class _AfterResponse:
+    """ASGI wrapper that calls `done` once the response is over, whether
+    the body was sent, failed, or never started (client disconnected)."""
+
+    def __init__(self, response, done: Callable[[], None]):
+        self.response = response
+        self.done = done
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.done()
+
+
+@app.middleware("http")
+async def request_profiling(request: Request, call_next):
+    """Sample the request's work when asked with X-Profile: 1 or ?profile=1.
+
+    Besides the executor threads, the event-loop thread is sampled for the
+    whole request (response pre-work and SSE generators run there); it is
+    shared, so its samples include other requests' coroutines. The profile
+    is saved once the response is over (so streams are covered end to end)
+    and fetched from /profiles/{X-Profile-Id}.
+    """
+    wanted = request.headers.get("x-profile") == "1" or request.query_params.get("profile") == "1"
+    if not wanted:
+        return await call_next(request)
+    if not _is_admin(request):
+        return ORJSONResponse({"detail": "Profiling requires an admin token"}, status_code=403)
+
+    profile_id = uuid.uuid4().hex
+    profiler = SamplingProfiler()
+    token = active_profiler.set(profiler)
+    profiler.start()
+    profiler.enter_thread()
+
+    def finish():
+        profiler.exit_thread()
+        # stopping joins the sampler thread: keep it off the loop. Not
+        # awaited, so it also runs when the response was cancelled.
+        io_executor.submit(save_profile, profile_id, profiler)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        finish()
+        raise
+    finally:
+        active_profiler.reset(token)
+
+    response.headers["X-Profile-Id"] = profile_id
+    return _AfterResponse(response, finish)
+
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """Tag every log line of a request with its id and log one access line."""
+    rid = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id.set(rid)
+    timings = StageTimings()
+    timings_token = stage_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        stage_timings.reset(timings_token)
+        request_id.reset(token)
+
+    response.headers["X-Request-ID"] = rid
+    # streamed bodies are still running here; their stages are only logged
+    if timings.totals:
+        response.headers["Server-Timing"] = timings.server_timing()
+    logger.info(
+        "request",
+        extra={
+            "request_id": rid,
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": elapsed_ms(start),
+            "stages_ms": {k: round(v * 1000, 1) for k, v in timings.totals.items()},
+        },
+    )
+    return response
+
+
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
+
+
+@app.get("/stats/transcript-client")
+async def transcript_client_stats():
+    return connection_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/profiles/{profile_id}")
+async def fetch_profile(profile_id: str, request: Request):
+    """Collapsed stacks (flamegraph.pl / speedscope) of a profiled request."""
+    if not _is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    path = profile_path(profile_id)
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, HttpUrl
-from typing import List
+from pydantic import BaseModel, HttpUrl, Field, confloat
+from typing import List, Literal, Optional
+from app.core.config import FRAME_MAX_TIMESTAMPS, MAX_TARGET_CHAPTERS
 class YouTubeRequest(BaseModel):
     url: HttpUrl
     segment_seconds: int = 60
@@ -24,7 +25,12 @@ class YouTubeURL(BaseModel):
 
 class SegmentedTranscriptRequest(BaseModel):
     url: HttpUrl
-    segment_seconds: int = 60
+    segment_seconds: int = Field(60, gt=0)
+
+class TranscriptRangeRequest(BaseModel):
+    url: HttpUrl
+    start: float = Field(0, ge=0)
+    end: float = Field(..., gt=0)
 
 class Segment(BaseModel):
     start: float
@@ -38,4 +44,30 @@ class Metadata(BaseModel):
 
 class TranscriptRequest(BaseModel):
     transcriptSegments: List[Segment]
-    metadata:Metadata
\ No newline at end of file
+    metadata:Metadata
+    # "keywords" titles chapters locally (no LLM call), e.g. for backfills
+    title_mode: Literal["llm", "keywords"] = "llm"
+    # pick boundaries for this many chapters (with sub-chapters) instead of
+    # detecting the count from topic shifts
+    target_chapters: Optional[int] = Field(None, ge=1, le=MAX_TARGET_CHAPTERS)
+
+class FrameJobRequest(BaseModel):
+    url: HttpUrl
+    mode: Literal["slides", "clip"] = "slides"
+    timestamps: Optional[List[confloat(ge=0)]] = Field(None, max_length=FRAME_MAX_TIMESTAMPS)
+
+
+class AnalyzeRequest(BaseModel):
+    url: HttpUrl
+    mode: Literal["slides", "clip"] = "slides"
+    segment_seconds: int = Field(60, gt=0)
+    title_mode: Literal["llm", "keywords"] = "llm"
+    target_chapters: Optional[int] = Field(None, ge=1, le=MAX_TARGET_CHAPTERS)
+
+
+class BulkRequest(BaseModel):
+    playlist_url: Optional[HttpUrl] = None
+    urls: List[HttpUrl] = []
+    include_metadata: bool = True
+    include_transcript: bool = True
+    whisper_fallback: bool = False
@@ -0,0 +1,120 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+
+import yt_dlp
+
+from app.core.config import BULK_WORKERS, BULK_MAX_VIDEOS
+from app.core.executors import run_io, run_model
+from app.services.transcript_service import fetch_youtube_transcript, whisper_transcribe
+from app.services.youtube_metadata import get_video_metadata
+from app.utils.transcript import Transcript
+from app.utils.video_id import extract_video_id
+
+
+# =========================
+# RESOLVE ENTRIES
+# =========================
+def resolve_playlist(url: str, limit: int = BULK_MAX_VIDEOS) -> List[str]:
+    """List the video ids of a playlist or channel without visiting each video."""
+    ydl_opts = {
+        "quiet": True,
+        "skip_download": True,
+        "extract_flat": "in_playlist",
+        "playlistend": limit,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    entries = info.get("entries") or [info]
+    ids = []
+    for entry in entries:
+        # channels nest their tabs (videos, shorts…) as playlists of their own
+        if entry.get("_type") == "playlist":
+            entries.extend(entry.get("entries") or [])
+            continue
+        video_id = entry.get("id")
+        if video_id and len(video_id) == 11 and video_id not in ids:
+            ids.append(video_id)
+
+    return ids[:limit]
+
+
+def resolve_video_ids(playlist_url: Optional[str], urls: List[str]) -> List[str]:
+    ids = resolve_playlist(playlist_url) if playlist_url else []
+
+    for url in urls:
+        video_id = extract_video_id(url)
+        if video_id and video_id not in ids:
+            ids.append(video_id)
+
+    return ids[:BULK_MAX_VIDEOS]
+
+
+# =========================
+# PER-VIDEO WORK
+# =========================
+async def process_video(
+    video_id: str,
+    include_metadata: bool,
+    include_transcript: bool,
+    whisper_fallback: bool,
+) -> Dict:
+    result = {"type": "video", "video_id": video_id}
+
+    try:
+        if include_metadata:
+            result["metadata"] = await run_io(
+                get_video_metadata, f"https://www.youtube.com/watch?v={video_id}"
+            )
+
+        if include_transcript:
+            transcript = await run_io(fetch_youtube_transcript, video_id)
+            source = "youtube"
+            if not transcript and whisper_fallback:
+                transcript = await run_model(whisper_transcribe, video_id)
+                source = "whisper"
+            result["transcript_source"] = source if transcript else None
+            # same shape and rounding as /youtube/transcript
+            parsed = await run_io(Transcript.from_segments, transcript or [])
+            result["transcript"] = await run_io(parsed.to_dicts, True)
+    except Exception as e:
+        result["error"] = str(e)
+
+    return result
+
+
+# =========================
+# BULK STREAM
+# =========================
+async def iter_bulk_results(
+    video_ids: List[str],
+    include_metadata: bool = True,
+    include_transcript: bool = True,
+    whisper_fallback: bool = False,
+) -> AsyncIterator[Dict]:
+    """Yield per-video results in completion order.
+
+    At most BULK_WORKERS videos are processed at once, and closing the
+    generator (client disconnect) cancels whatever is still in flight.
+    """
+    pending_ids = list(video_ids)
+    in_flight = set()
+
+    try:
+        while pending_ids or in_flight:
+            while pending_ids and len(in_flight) < BULK_WORKERS:
+                in_flight.add(asyncio.create_task(process_video(
+                    pending_ids.pop(0),
+                    include_metadata,
+                    include_transcript,
+                    whisper_fallback,
+                )))
+
+            done, in_flight = await asyncio.wait(
+                in_flight, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -1,62 +1,109 @@
 from sentence_transformers import SentenceTransformer
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from scipy.ndimage import gaussian_filter1d
 import numpy as np
+import bisect
+import contextvars
+import hashlib
 import re
-from app.utils.gemini import client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Callable, Dict, List, Optional
+from app.core.config import ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL, MAX_TARGET_CHAPTERS
+from app.core.log import get_logger
+from app.core.metrics import llm_failures, register_cache, timed
+from app.core.profiling import profiled
+from app.utils.changepoint import ChangePoints
+from app.utils.gemini import get_client
+from app.utils.filler_words import FILLER_WORDS
+from app.utils.transcript import Transcript
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
 
 # =========================
 # MODEL
 # =========================
-model = SentenceTransformer("all-MiniLM-L6-v2")
+MODEL_NAME = "all-MiniLM-L6-v2"
+model = None
+_model_lock = threading.Lock()
+
+
+def load_model():
+    """Load the sentence embedding model on first use."""
+    global model
+    with _model_lock:
+        if model is None:
+            model = SentenceTransformer(MODEL_NAME)
+    return model
+
 
 WINDOW_SIZE = 3
 LOCAL_WINDOW = 6
 DEPTH_THRESHOLD = 0.15
 MIN_CHAPTER_SECONDS = 120
 
+# Change-point engine (target chapter counts and sub-chapters)
+SUBCHAPTER_FACTOR = 3              # sub-chapter level has this many times the chapters
+SUBCHAPTER_MIN_SECONDS = 30
+# finest granularity, computed once per transcript: enough splits for the
+# sub-chapters of the largest target, so every target cuts the same list
+CHANGEPOINT_MAX_SPLITS = MAX_TARGET_CHAPTERS * SUBCHAPTER_FACTOR - 1
+
+# Pipeline stages per transcript (ChapterAnalysis), so asking for another
+# chapter count or title mode skips the model
+analysis_cache = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+register_cache("chapter_analysis", analysis_cache)
+
+# Title prompts
+TITLE_PROMPT_TOKENS = 2000         # excerpt budget per LLM request
+TITLE_MIN_CHAPTER_TOKENS = 60      # below this the chapters are split into batches
+TITLE_MAX_CHAPTER_TOKENS = 225     # ~900 chars, the old per-chapter cap
+TITLE_MAX_PARALLEL = 4
+TITLE_LLM_TIMEOUT = 30             # seconds before falling back to local titles
+CHARS_PER_TOKEN = 4                # rough estimate for English text
+
+KEY_SENTENCES = 3                  # sentences representing each chapter
+
+# Keyword (LLM-free) titles
+TITLE_MODES = ("llm", "keywords")
+KEYWORD_TITLE_WORDS = 5
+KEYWORD_TITLE_PRIOR = 1.5          # boost for terms that also appear in the video title
+
 
 # =========================
 # SPLIT INTO SENTENCES (RESTORED)
 # =========================
-def split_into_sentences(segments):
-    new_segments = []
-
-    for seg in segments:
-        text = seg["text"] if isinstance(seg, dict) else seg.text
-        start = seg["start"] if isinstance(seg, dict) else seg.start
-        end = seg["end"] if isinstance(seg, dict) else seg.end
-
+@timed("sentence_split")
+def split_into_sentences(segments) -> Transcript:
+    transcript = Transcript.from_segments(segments)
+
+    starts, ends, texts = [], [], []
+    for start, end, text in zip(
+        transcript.start.tolist(), transcript.end.tolist(), transcript.texts()
+    ):
         sentences = re.split(r'(?<=[.!?])\s+', text)
 
         duration = (end - start) / max(len(sentences), 1)
 
         for i, sentence in enumerate(sentences):
-            new_segments.append({
-                "start": start + i * duration,
-                "end": start + (i + 1) * duration,
-                "text": sentence.strip()
-            })
+            starts.append(start + i * duration)
+            ends.append(start + (i + 1) * duration)
+            texts.append(sentence.strip())
 
-    return new_segments
+    return Transcript.from_columns(starts, ends, texts)
 
 
 # =========================
 # HELPERS
 # =========================
-def get_field(seg, field):
-    if isinstance(seg, dict):
-        return seg[field]
-    return getattr(seg, field)
-
-
-def build_windows(segments):
+def build_windows(segments: Transcript):
+    texts = segments.texts()
     windows = []
-    for i in range(len(segments) - WINDOW_SIZE + 1):
-        text = " ".join(
-            get_field(segments[j], "text") for j in range(i, i + WINDOW_SIZE)
-        )
-        windows.append(text)
+    for i in range(len(texts) - WINDOW_SIZE + 1):
+        windows.append(" ".join(texts[i:i + WINDOW_SIZE]))
     return windows
 
 
@@ -69,9 +116,10 @@ def compute_similarity(embeddings):
 # =========================
 # BOUNDARY DETECTION
 # =========================
-def detect_boundaries(similarities, segments):
+def detect_boundaries(similarities, segments: Transcript):
+    starts = segments.start.tolist()
     boundaries = []
-    last_boundary = get_field(segments[0], "start")
+    last_boundary = starts[0]
 
     for i in range(len(similarities)):
         left_start = max(0, i - LOCAL_WINDOW)
@@ -84,7 +132,7 @@ def detect_boundaries(similarities, segments):
         depth = (left_peak - valley) + (right_peak - valley)
 
         if depth > DEPTH_THRESHOLD:
-            boundary_time = get_field(segments[i+1], "start")
+            boundary_time = starts[i+1]
 
             if boundary_time - last_boundary < MIN_CHAPTER_SECONDS:
                 continue
@@ -98,58 +146,162 @@ def detect_boundaries(similarities, segments):
 # =========================
 # BUILD CHAPTERS
 # =========================
-def build_chapters(boundaries, segments):
-    chapters = []
-    start_idx = 0
+def chapter_spans(boundaries, n_segments: int):
+    """[start_idx, end_idx) of every non-empty chapter."""
+    edges = [0, *boundaries, n_segments]
+    return [(a, b) for a, b in zip(edges, edges[1:]) if b > a]
 
-    for boundary in boundaries:
-        chapter_segments = segments[start_idx:boundary]
-        if not chapter_segments:
-            continue
 
-        chapters.append({
-            "start": get_field(chapter_segments[0], "start"),
-            "end": get_field(chapter_segments[-1], "end"),
-            "text": " ".join(get_field(s, "text") for s in chapter_segments)[:900]
-        })
+def build_chapters(boundaries, segments: Transcript, vectors=None):
+    """Chapters with start/end and their `text`.
 
-        start_idx = boundary
+    With sentence vectors (see sentence_vectors) `text` is the chapter's
+    whole text, for TF-IDF titles and LLM excerpts, and `key_sentences` its
+    KEY_SENTENCES most central sentences in transcript order; without, the
+    text is the first 900 characters as before.
+    """
+    chapters = []
 
-    if start_idx < len(segments):
-        chapter_segments = segments[start_idx:]
-        chapters.append({
-            "start": get_field(chapter_segments[0], "start"),
-            "end": get_field(chapter_segments[-1], "end"),
-            "text": " ".join(get_field(s, "text") for s in chapter_segments)[:900]
-        })
+    for start_idx, end_idx in chapter_spans(boundaries, len(segments)):
+        chapter = {
+            "start": float(segments.start[start_idx]),
+            "end": float(segments.end[end_idx - 1]),
+        }
+        if vectors is None:
+            chapter["text"] = segments.join_text(start_idx, end_idx)[:900]
+        else:
+            ranked = rank_sentences(vectors, start_idx, end_idx)[:KEY_SENTENCES]
+            chapter["text"] = segments.join_text(start_idx, end_idx)
+            chapter["key_sentences"] = [segments.text(start_idx + k) for k in sorted(ranked)]
+        chapters.append(chapter)
 
     return chapters
 
 
+_TITLE_SKIP = set(FILLER_WORDS) | {"num", "and", "the", "a", "an", "now", "then", "we", "i"}
+
+
+def extractive_title(sentence: str, max_words: int = 6) -> str:
+    """An LLM-free title from a key sentence: its first content words."""
+    words = re.findall(r"[\w'-]+", sentence)
+    while words and words[0].lower() in _TITLE_SKIP:
+        words.pop(0)
+    words = [w for w in words if w.lower() != "num"][:max_words]
+    if not words:
+        return ""
+    title = " ".join(words)
+    return title[0].upper() + title[1:]
+
+
 # =========================
-# TITLE GENERATION (YOUR BEST VERSION FIXED)
+# KEY SENTENCES
 # =========================
-def generate_chapter_titles(chapters, metadata):
-    # ✅ handle both dict and object safely
-    if isinstance(metadata, dict):
-        video_title = metadata.get("title", "") or ""
-        description = (metadata.get("description", "") or "")[:1000]
-    else:
-        video_title = getattr(metadata, "title", "") or ""
-        description = (getattr(metadata, "description", "") or "")[:1000]
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def sentence_vectors(embeddings, n_sentences: int) -> np.ndarray:
+    """Per-sentence vectors from the sliding-window embeddings.
+
+    Window i covers sentences i..i+WINDOW_SIZE-1, so a sentence is the mean
+    of the windows that contain it. No extra model calls.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    n_windows = len(embeddings)
+    if n_windows == 0:
+        return np.zeros((n_sentences, 0), dtype=np.float32)
+
+    csum = np.zeros((n_windows + 1, embeddings.shape[1]), dtype=np.float32)
+    np.cumsum(embeddings, axis=0, out=csum[1:])
+
+    idx = np.arange(n_sentences)
+    lo = np.clip(idx - WINDOW_SIZE + 1, 0, n_windows)
+    hi = np.clip(idx + 1, 0, n_windows)
+    hi = np.maximum(hi, lo + 1)
+    lo = np.minimum(lo, n_windows - 1)
+    return (csum[hi] - csum[lo]) / (hi - lo)[:, None]
+
+
+def rank_sentences(vectors, start_idx: int, end_idx: int) -> List[int]:
+    """Offsets (from start_idx) of the chapter's sentences, most central first:
+    cosine similarity to the mean of the chapter's sentence vectors."""
+    chunk = np.asarray(vectors[start_idx:end_idx])
+    if chunk.size == 0:
+        # no embeddings to rank with; keep the opening sentences
+        return list(range(max(end_idx - start_idx, 0)))
+
+    centroid = chunk.mean(axis=0)
+    norms = np.linalg.norm(chunk, axis=1) * (np.linalg.norm(centroid) or 1.0)
+    scores = chunk @ centroid / np.where(norms == 0, 1.0, norms)
+    return np.argsort(-scores, kind="stable").tolist()
+
+
+def key_sentences(segments: Transcript, vectors, start_idx: int, end_idx: int, k: int = KEY_SENTENCES) -> List[str]:
+    """The k most central non-empty sentences, most central first."""
+    picked = []
+    for offset in rank_sentences(vectors, start_idx, end_idx):
+        text = segments.text(start_idx + offset)
+        if text:
+            picked.append(text)
+            if len(picked) == k:
+                break
+    return picked
+
+
+def select_key_sentences(segments: Transcript, vectors, start_idx: int, end_idx: int, max_tokens: int) -> str:
+    """The chapter's most central sentences that fit in `max_tokens`, in
+    their original order."""
+    if end_idx <= start_idx:
+        return ""
+
+    picked, used = [], 0
+    for k in rank_sentences(vectors, start_idx, end_idx):
+        text = segments.text(start_idx + k)
+        cost = estimate_tokens(text) + 1
+        if not text or (picked and used + cost > max_tokens):
+            continue
+        picked.append(k)
+        used += cost
+        if used >= max_tokens:
+            break
+
+    return " ".join(segments.text(start_idx + k) for k in sorted(picked))[:max_tokens * CHARS_PER_TOKEN]
 
+
+# =========================
+# TITLE PROMPT PLANNING
+# =========================
+def plan_title_batches(n_chapters: int):
+    """Split chapters into [start, end) batches that each fit the prompt
+    budget, and the per-chapter excerpt budget in tokens."""
+    if n_chapters == 0:
+        return [], TITLE_MAX_CHAPTER_TOKENS
+
+    per_chapter = TITLE_PROMPT_TOKENS // n_chapters
+    if per_chapter >= TITLE_MIN_CHAPTER_TOKENS:
+        return [(0, n_chapters)], min(per_chapter, TITLE_MAX_CHAPTER_TOKENS)
+
+    # fewest batches that keep every chapter at the minimum, evenly sized
+    max_size = max(1, TITLE_PROMPT_TOKENS // TITLE_MIN_CHAPTER_TOKENS)
+    n_batches = -(-n_chapters // max_size)
+    size = -(-n_chapters // n_batches)
+    batches = [(i, min(i + size, n_chapters)) for i in range(0, n_chapters, size)]
+    return batches, min(TITLE_PROMPT_TOKENS // size, TITLE_MAX_CHAPTER_TOKENS)
+
+
+def _title_prompt(video_title: str, description: str, chapters, excerpts, offset: int) -> str:
     chapters_text = ""
-    for i, chapter in enumerate(chapters):
-        start = get_field(chapter, "start")
+    for i, (chapter, excerpt) in enumerate(zip(chapters, excerpts)):
+        start = chapter["start"]
         start_min = int(start // 60)
         start_sec = int(start % 60)
 
         chapters_text += (
-            f"\nChapter {i+1} [{start_min:02d}:{start_sec:02d}]:\n"
-            f"{chapter['text']}\n"
+            f"\nChapter {offset+i+1} [{start_min:02d}:{start_sec:02d}]:\n"
+            f"{excerpt}\n"
         )
 
-    prompt = f"""You are generating YouTube chapter titles.
+    return f"""You are generating YouTube chapter titles.
 
 Video Title: {video_title}
 {"Video Description: " + description if description else ""}
@@ -167,8 +319,10 @@ Transcript Chapters:
 {chapters_text}
 """
 
+
+def _request_titles(prompt: str, count: int, offset: int, fallbacks: List[str]):
     try:
-        response = client.models.generate_content(
+        response = get_client().models.generate_content(
             model="gemma-3-27b-it",
             contents=prompt
         )
@@ -179,45 +333,375 @@ Transcript Chapters:
         lines = [l[:80] for l in lines]
 
         # ensure correct count
-        while len(lines) < len(chapters):
-            lines.append(f"Chapter {len(lines)+1}")
+        while len(lines) < count:
+            lines.append(fallbacks[len(lines)])
+
+        return lines[:count]
 
-        return lines[:len(chapters)]
+    except Exception:
+        logger.warning("chapter title generation failed", exc_info=True)
+        llm_failures.inc()
+        return fallbacks
 
-    except Exception as e:
-        print("Gemini error:", e)
-        return [f"Chapter {i+1}" for i in range(len(chapters))]
+
+# =========================
+# TITLE GENERATION (YOUR BEST VERSION FIXED)
+# =========================
+@timed("llm_titles")
+def generate_chapter_titles(chapters, metadata, excerpts=None, fallbacks=None):
+    """Titles for `chapters`, in order.
+
+    `excerpts` are the per-chapter prompt texts (see select_key_sentences);
+    without them each chapter's text is cut to the planned budget. Over
+    budget, chapters are sent in sub-batches concurrently. `fallbacks`
+    replace titles the LLM did not return (default: extractive titles from
+    each chapter's first key sentence or its text, then "Chapter N").
+    """
+    # ✅ handle both dict and object safely
+    if isinstance(metadata, dict):
+        video_title = metadata.get("title", "") or ""
+        description = (metadata.get("description", "") or "")[:1000]
+    else:
+        video_title = getattr(metadata, "title", "") or ""
+        description = (getattr(metadata, "description", "") or "")[:1000]
+
+    batches, per_chapter = plan_title_batches(len(chapters))
+    if excerpts is None:
+        excerpts = [c["text"][:per_chapter * CHARS_PER_TOKEN] for c in chapters]
+
+    if fallbacks is None:
+        fallbacks = [extractive_title((c.get("key_sentences") or [c["text"]])[0]) for c in chapters]
+    fallbacks = [t or f"Chapter {i+1}" for i, t in enumerate(fallbacks)]
+
+    prompts = [
+        (_title_prompt(video_title, description, chapters[a:b], excerpts[a:b], a), b - a, a, fallbacks[a:b])
+        for a, b in batches
+    ]
+    if not prompts:
+        return []
+
+    # copy the context so request ids and stage timers follow each batch,
+    # and sample the batch threads if the request is profiled
+    pool = ThreadPoolExecutor(
+        max_workers=min(TITLE_MAX_PARALLEL, len(prompts)), thread_name_prefix="titles"
+    )
+    request_titles = profiled(_request_titles)
+    futures = [pool.submit(contextvars.copy_context().run, request_titles, *p) for p in prompts]
+    # don't wait for a hung request; it finishes in the background
+    pool.shutdown(wait=False)
+
+    deadline = time.monotonic() + TITLE_LLM_TIMEOUT
+    titles = []
+    for (_, count, offset, batch_fallbacks), future in zip(prompts, futures):
+        try:
+            titles.extend(future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except FuturesTimeout:
+            logger.warning("chapter title generation timed out", extra={"chapters": count, "offset": offset})
+            llm_failures.inc()
+            titles.extend(batch_fallbacks)
+    return titles
+
+
+# =========================
+# KEYWORD TITLES (NO LLM)
+# =========================
+_KEYWORD_STOP_WORDS = sorted(
+    ENGLISH_STOP_WORDS | {w for w in FILLER_WORDS if " " not in w} | {"num", "gonna", "wanna", "let", "lets"}
+)
+
+
+def _video_title(metadata) -> str:
+    if isinstance(metadata, dict):
+        return metadata.get("title", "") or ""
+    return getattr(metadata, "title", "") or ""
+
+
+@timed("keyword_titles")
+def keyword_titles(chapters, metadata) -> List[str]:
+    """Titles from each chapter's highest TF-IDF phrases, in milliseconds.
+
+    Chapters are the documents, so words common to the whole video rank
+    low unless the video title uses them too (KEYWORD_TITLE_PRIOR). Titles
+    that would repeat an earlier chapter's fall through to the next phrase.
+    Empty strings where a chapter has no usable terms.
+    """
+    if not chapters:
+        return []
+
+    vectorizer = TfidfVectorizer(
+        ngram_range=(1, 2),
+        stop_words=_KEYWORD_STOP_WORDS,
+        token_pattern=r"(?u)\b[a-zA-Z][a-zA-Z'-]+\b",
+        sublinear_tf=True,
+    )
+    try:
+        matrix = vectorizer.fit_transform([c["text"] for c in chapters])
+    except ValueError:
+        # only stop words in every chapter
+        return ["" for _ in chapters]
+
+    terms = vectorizer.get_feature_names_out()
+    title_words = set(re.findall(r"[a-z']+", _video_title(metadata).lower()))
+    prior = np.array([
+        KEYWORD_TITLE_PRIOR if title_words.intersection(t.split()) else 1.0 for t in terms
+    ])
+
+    titles, used = [], set()
+    for row in range(matrix.shape[0]):
+        scores = matrix.getrow(row).toarray().ravel() * prior
+        ranked = [terms[i] for i in np.argsort(-scores) if scores[i] > 0][:12]
+
+        # best phrases until the title has two words and is not a repeat
+        words: List[str] = []
+        for phrase in ranked:
+            new = list(dict.fromkeys(w for w in phrase.split() if w not in words))
+            if not new or len(words) + len(new) > KEYWORD_TITLE_WORDS:
+                continue
+            words.extend(new)
+            if len(words) >= 2 and " ".join(words) not in used:
+                break
+
+        title = " ".join(words).title()
+        used.add(" ".join(words))
+        titles.append(title)
+
+    return titles
+
+
+# =========================
+# PIPELINE STAGES
+# =========================
+class ChapterAnalysis:
+    """Intermediate results of the chapter pipeline for one transcript.
+
+        segments → sentences → windows → embeddings → vectors
+                                                    → similarities → boundaries
+                                                    → changepoints
+
+    Each stage is computed on first access and kept, so it runs at most
+    once per transcript. Instances are shared through analysis_cache, so
+    later requests (another chapter count or title mode, /analyze on the
+    same video) start from the stages already computed.
+    """
+
+    def __init__(self, segments):
+        self.segments = Transcript.from_segments(segments)
+        self._stages: Dict[str, object] = {}
+        # reentrant: stages pull in the stages they depend on
+        self._lock = threading.RLock()
+
+    def _stage(self, name: str, compute: Callable[[], object]):
+        with self._lock:
+            if name not in self._stages:
+                self._stages[name] = compute()
+            return self._stages[name]
+
+    @property
+    def sentences(self) -> Transcript:
+        return self._stage("sentences", lambda: split_into_sentences(self.segments))
+
+    @property
+    def windows(self) -> List[str]:
+        return self._stage("windows", lambda: build_windows(self.sentences))
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        def compute():
+            windows = self.windows
+            with timed("embedding"):
+                return load_model().encode(windows, show_progress_bar=False)
+        return self._stage("embeddings", compute)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Per-sentence vectors (see sentence_vectors)."""
+        return self._stage(
+            "vectors", lambda: sentence_vectors(self.embeddings, len(self.sentences))
+        )
+
+    @property
+    def similarities(self) -> np.ndarray:
+        return self._stage("similarities", lambda: compute_similarity(self.embeddings))
+
+    @property
+    def boundaries(self) -> List[int]:
+        """Chapter starts found by the depth-score pass."""
+        def compute():
+            similarities, sentences = self.similarities, self.sentences
+            with timed("boundary_detection"):
+                return detect_boundaries(similarities, sentences)
+        return self._stage("boundaries", compute)
+
+    @property
+    def changepoints(self) -> ChangePoints:
+        """Split order over the sentence vectors.
+
+        Computed once with CHANGEPOINT_MAX_SPLITS; any chapter count up to
+        CHANGEPOINT_MAX_SPLITS + 1 is a prefix of it, so a different
+        target_chapters costs O(k log k) and never re-segments.
+        """
+        def compute():
+            vectors, sentences = self.vectors, self.sentences
+            with timed("changepoints"):
+                return ChangePoints(
+                    vectors,
+                    sentences.start,
+                    float(sentences.end[-1]) if len(sentences) else 0.0,
+                    min_seconds=SUBCHAPTER_MIN_SECONDS,
+                    max_splits=CHANGEPOINT_MAX_SPLITS,
+                )
+        return self._stage("changepoints", compute)
+
+
+def _transcript_key(segments: Transcript) -> str:
+    digest = hashlib.sha1(segments.buffer.encode("utf-8"))
+    digest.update(segments.start.tobytes())
+    digest.update(segments.end.tobytes())
+    digest.update(segments.offsets.tobytes())
+    return digest.hexdigest()
+
+
+_analysis_lock = threading.Lock()
+
+
+def analyze_transcript(segments) -> ChapterAnalysis:
+    """The shared ChapterAnalysis for these (unsplit) transcript segments.
+
+    Created under a lock (construction is cheap; the stages run later,
+    under the instance's own lock), so concurrent requests for the same
+    transcript get one instance and encode it once.
+    """
+    segments = Transcript.from_segments(segments)
+    key = _transcript_key(segments)
+    with _analysis_lock:
+        analysis = analysis_cache.get(key)
+        if analysis is None:
+            analysis = ChapterAnalysis(segments)
+            analysis_cache.set(key, analysis)
+    return analysis
+
+
+def attach_subchapters(chapters, sub_boundaries, segments: Transcript, vectors, metadata):
+    """Nest the finer segmentation under each chapter, titled by keywords."""
+    subchapters = build_chapters(sub_boundaries, segments, vectors)
+    for sub, title in zip(subchapters, keyword_titles(subchapters, metadata)):
+        sub["title"] = title
+
+    starts = [c["start"] for c in chapters]
+    for chapter in chapters:
+        chapter["subchapters"] = []
+    if not chapters:
+        return chapters
+
+    for sub in subchapters:
+        idx = max(0, bisect.bisect_right(starts, sub["start"]) - 1)
+        chapters[idx]["subchapters"].append(sub)
+    return chapters
 
 
 # =========================
 # MAIN FUNCTION
 # =========================
-def generate_chapters(segments, metadata):
-    if not isinstance(metadata, dict):
-        metadata = {}
+# YouTube description chapters start with a "0:00" / "00:00" line
+_DESCRIPTION_CHAPTERS = re.compile(r"^\s*0?0:00\b", re.MULTILINE)
 
-    # 1️⃣ sentence split
-    segments = split_into_sentences(segments)
 
-    # 2️⃣ embeddings
-    texts = build_windows(segments)
-    embeddings = model.encode(texts, show_progress_bar=False)
+def _metadata_dict(metadata) -> Dict:
+    """Plain dict from a dict or the request's pydantic Metadata."""
+    if isinstance(metadata, dict):
+        return metadata
+    if hasattr(metadata, "model_dump"):
+        return metadata.model_dump()
+    return {}
+
+
+def outline_chapters(
+    segments,
+    metadata,
+    title_mode: str = "llm",
+    target_chapters: Optional[int] = None,
+) -> Dict:
+    """Model half of generate_chapters: sentences, embeddings, boundaries,
+    chapters and local titles. Run it on the model pool; the LLM round trip
+    in title_chapters belongs on the I/O pool.
+
+    With `target_chapters`, boundaries come from the change-point engine
+    instead of the depth-score pass, and each chapter carries keyword-titled
+    `subchapters` from the next finer level of the same hierarchy.
+    """
+    if title_mode not in TITLE_MODES:
+        raise ValueError(f"Unknown title mode: {title_mode}")
+    metadata = _metadata_dict(metadata)
+
+    # 1️⃣-4️⃣ sentences, embeddings and boundaries, each computed once
+    analysis = analyze_transcript(segments)
+    segments, vectors = analysis.sentences, analysis.vectors
+
+    if target_chapters:
+        boundaries = analysis.changepoints.boundaries(target_chapters)
+    else:
+        boundaries = analysis.boundaries
+
+    # 5️⃣ chapters, with their most central sentences
+    chapters = build_chapters(boundaries, segments, vectors)
+    if target_chapters:
+        sub_boundaries = analysis.changepoints.boundaries(target_chapters * SUBCHAPTER_FACTOR)
+        attach_subchapters(chapters, sub_boundaries, segments, vectors, metadata)
 
-    # 3️⃣ similarity
-    similarities = compute_similarity(embeddings)
+    outline = {"chapters": chapters, "metadata": metadata, "titles": None, "excerpts": None, "fallbacks": None}
 
-    # 4️⃣ boundaries
-    boundaries = detect_boundaries(similarities, segments)
+    # 6️⃣ titles (only if the description has no chapters of its own)
+    if _DESCRIPTION_CHAPTERS.search(metadata.get("description") or ""):
+        return outline
 
-    # 5️⃣ chapters
-    chapters = build_chapters(boundaries, segments)
+    spans = chapter_spans(boundaries, len(segments))
 
-    # 6️⃣ titles (only if no description chapters used)
-    description = metadata.get("description", "")
+    # local titles: keywords, else the chapter's most central sentence.
+    # Also the instant fallback if the LLM fails or times out.
+    fallbacks = [
+        keywords or extractive_title((key_sentences(segments, vectors, a, b, k=1) or [""])[0])
+        for keywords, (a, b) in zip(keyword_titles(chapters, metadata), spans)
+    ]
 
-    if not description:
-        titles = generate_chapter_titles(chapters, metadata)
+    if title_mode == "keywords":
+        outline["titles"] = [t or f"Chapter {i+1}" for i, t in enumerate(fallbacks)]
+    else:
+        # prompt with each chapter's most central sentences, sized to the plan
+        _, per_chapter = plan_title_batches(len(chapters))
+        outline["excerpts"] = [
+            select_key_sentences(segments, vectors, a, b, per_chapter)
+            for a, b in spans
+        ]
+        outline["fallbacks"] = fallbacks
+    return outline
+
+
+def title_chapters(outline: Dict) -> List[Dict]:
+    """LLM half of generate_chapters: title the outlined chapters (if the
+    outline left that to the LLM) and return them."""
+    chapters = outline["chapters"]
+    titles = outline["titles"]
+    if titles is None and outline["excerpts"] is not None:
+        titles = generate_chapter_titles(
+            chapters, outline["metadata"], outline["excerpts"], outline["fallbacks"]
+        )
+
+    if titles is not None:
         for i, c in enumerate(chapters):
             c["title"] = titles[i]
+    return chapters
+
+
+def generate_chapters(
+    segments,
+    metadata,
+    title_mode: str = "llm",
+    target_chapters: Optional[int] = None,
+):
+    """Chapters for a transcript; titled by the LLM or, with
+    title_mode="keywords", locally from TF-IDF keywords.
 
-    return chapters
\ No newline at end of file
+    Blocking callers use this; async routes run outline_chapters on the
+    model pool and title_chapters on the I/O pool.
+    """
+    return title_chapters(outline_chapters(segments, metadata, title_mode, target_chapters))
@@ -0,0 +1,712 @@
+import os
+import hashlib
+import subprocess
+import shutil
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import torch
+import clip
+import numpy as np
+from PIL import Image
+import cv2
+import pytesseract
+from difflib import SequenceMatcher
+import yt_dlp
+from app.core.config import TEMP_DIR, FRAME_JOB_CONCURRENCY
+from app.core.log import get_logger
+from app.services.job_service import Job, submit_job
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+logger = get_logger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# file names inside a job's working directory
+VIDEO_FILE = "video.%(ext)s"
+FRAME_DIR = "frames"
+OUTPUT_DIR = "unique_frames"
+
+FPS = 1
+CLIP_THRESHOLD = 0.9
+CLIP_LOOKBACK = 5          # compare against the last N kept frames
+CLIP_GLOBAL_DEDUP = False  # compare against every kept frame (revisited slides)
+TEXT_SIM_THRESHOLD = 0.7
+MIN_TEXT_LENGTH = 20
+
+# Download quality: the lowest video-only stream at or above the height
+# floor of the mode. "slides" needs legible text for OCR; "clip" only
+# feeds 224px CLIP inputs and skips OCR entirely.
+FRAME_MODES = {
+    "slides": 720,
+    "clip": 360,
+}
+DEFAULT_FRAME_MODE = "slides"
+
+# OCR stage
+OCR_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+OCR_MAX_WIDTH = 1280      # downscale wider frames before OCR (0 = keep size)
+OCR_BINARIZE = True       # Otsu threshold before OCR
+OCR_CROP_TEXT = True      # crop to detected text region before OCR
+OCR_CACHE_DIR = os.path.join(TEMP_DIR, "ocr_cache")   # one <hash>.txt per frame
+OCR_CACHE_MAX_ENTRIES = 50_000                           # least recently used are evicted
+
+
+# =========================
+# LOAD CLIP MODEL
+# =========================
+device = "cuda" if torch.cuda.is_available() else "cpu"
+model, preprocess = None, None
+_clip_lock = threading.Lock()
+
+
+def load_clip():
+    """Load CLIP on first use so OCR pool workers never pay for it."""
+    global model, preprocess
+    with _clip_lock:
+        if model is None:
+            model, preprocess = clip.load("ViT-B/32", device=device)
+    return model, preprocess
+
+
+ProgressFn = Optional[Callable[[str, int], None]]
+
+
+# =========================
+# DOWNLOAD VIDEO
+# =========================
+def video_format_selector(min_height: int, with_audio: bool = False) -> str:
+    """Worst video-only stream meeting the height floor, H.264 preferred
+    (cheapest to decode); falls back to the best available below it.
+
+    with_audio adds the smallest audio stream, for callers that also need
+    to transcribe the same download.
+    """
+    floor = f"[height>={min_height}]"
+    videos = [f"wv{floor}[vcodec^=avc1]", f"wv{floor}", "bv"]
+    audio = "+wa" if with_audio else ""
+    return "/".join(v + audio for v in videos) + "/b"
+
+
+def download_video(
+    url: str,
+    work_dir: str,
+    min_height: int = FRAME_MODES[DEFAULT_FRAME_MODE],
+    on_progress: ProgressFn = None,
+    with_audio: bool = False,
+) -> str:
+    kind = "with audio" if with_audio else "video only"
+    logger.debug("downloading video", extra={"min_height": min_height, "kind": kind})
+
+    def ydl_progress_hook(d):
+        if on_progress and d.get("status") == "downloading":
+            downloaded = d.get("downloaded_bytes", 0)
+            total = d.get("total_bytes") or d.get("total_bytes_estimate") or 1
+            pct = int((downloaded / total) * 25)  # map download to 5–30%
+            on_progress(f"Downloading video… {pct * 4}%", pct + 5)
+
+    ydl_opts = {
+        "format": video_format_selector(min_height, with_audio=with_audio),
+        "outtmpl": os.path.join(work_dir, VIDEO_FILE),
+        "quiet": True,
+        "progress_hooks": [ydl_progress_hook],
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=True)
+        video_path = ydl.prepare_filename(info)
+
+    logger.debug(
+        "video downloaded",
+        extra={"format_id": info.get("format_id"), "height": info.get("height")},
+    )
+    return video_path
+
+
+def resolve_stream(url: str, min_height: int) -> Dict:
+    """Resolve the direct stream URL (and headers) for seek-based extraction."""
+    ydl_opts = {
+        "format": video_format_selector(min_height),
+        "quiet": True,
+        "skip_download": True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    return {
+        "url": info["url"],
+        "headers": info.get("http_headers") or {},
+        "duration": info.get("duration"),
+    }
+
+
+# =========================
+# EXTRACT FRAMES
+# =========================
+# Frames are named by their timestamp in milliseconds so both extraction
+# modes share one naming scheme and sort chronologically.
+def frame_name(millis: int) -> str:
+    return f"frame_{millis:09d}.jpg"
+
+
+def frame_timestamp(path: str) -> float:
+    millis = int(os.path.splitext(os.path.basename(path))[0].split("_")[-1])
+    return round(millis / 1000, 2)
+
+
+def _reset_frame_dir(work_dir: str) -> str:
+    frame_dir = os.path.join(work_dir, FRAME_DIR)
+    if os.path.exists(frame_dir):
+        shutil.rmtree(frame_dir)
+    os.makedirs(frame_dir, exist_ok=True)
+    return frame_dir
+
+
+def extract_frames(video_path: str, work_dir: str) -> List[str]:
+    frame_dir = _reset_frame_dir(work_dir)
+
+    subprocess.run([
+        "ffmpeg",
+        "-loglevel", "error",
+        "-i", video_path,
+        "-vf", f"fps={FPS}",
+        os.path.join(frame_dir, "raw_%06d.jpg")
+    ], check=True)
+
+    # ffmpeg numbers frames from 1; frame n was sampled at (n - 1) / FPS
+    frames = []
+    for f in sorted(os.listdir(frame_dir)):
+        number = int(f[len("raw_"):-len(".jpg")])
+        path = os.path.join(frame_dir, frame_name(round((number - 1) * 1000 / FPS)))
+        os.rename(os.path.join(frame_dir, f), path)
+        frames.append(path)
+
+    return frames
+
+
+def extract_frames_at(
+    source: str,
+    timestamps: List[float],
+    work_dir: str,
+    headers: Optional[Dict] = None,
+) -> List[str]:
+    """Grab single frames at the given timestamps using input seeking.
+
+    `source` may be a local file or a remote stream URL; ffmpeg only reads
+    the data around each seek point instead of decoding the whole video.
+    """
+    logger.debug("extracting frames by seeking", extra={"count": len(timestamps)})
+    frame_dir = _reset_frame_dir(work_dir)
+
+    header_args = []
+    if headers:
+        header_args = ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+
+    frames = []
+    for t in sorted(set(timestamps)):
+        path = os.path.join(frame_dir, frame_name(round(t * 1000)))
+        result = subprocess.run([
+            "ffmpeg",
+            "-loglevel", "error",
+            *header_args,
+            "-ss", f"{t:.3f}",
+            "-i", source,
+            "-frames:v", "1",
+            "-y", path
+        ], stderr=subprocess.PIPE, text=True)
+        if result.returncode == 0 and os.path.exists(path):
+            frames.append(path)
+        else:
+            logger.warning(
+                "ffmpeg frame extraction failed",
+                extra={
+                    "timestamp": t,
+                    "returncode": result.returncode,
+                    "stderr": result.stderr.strip()[-500:],
+                },
+            )
+
+    return frames
+
+
+# =========================
+# CLIP EMBEDDING
+# =========================
+def get_embedding(image_path):
+    """Return the L2-normalized float32 CLIP embedding of an image."""
+    model, preprocess = load_clip()
+    image = preprocess(Image.open(image_path)).unsqueeze(0).to(device)
+    with torch.no_grad():
+        embedding = model.encode_image(image)
+    emb = embedding.cpu().numpy()[0].astype(np.float32)
+    return emb / max(np.linalg.norm(emb), 1e-12)
+
+
+class EmbeddingRing:
+    """Fixed-size buffer of the most recent normalized embeddings."""
+
+    def __init__(self, capacity, dim):
+        self.buffer = np.zeros((capacity, dim), dtype=np.float32)
+        self.capacity = capacity
+        self.count = 0
+        self.pos = 0
+
+    def add(self, emb):
+        self.buffer[self.pos] = emb
+        self.pos = (self.pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def max_similarity(self, emb):
+        if self.count == 0:
+            return -1.0
+        return float(np.max(self.buffer[:self.count] @ emb))
+
+
+class EmbeddingIndex:
+    """Exact inner-product index over every kept embedding.
+
+    Uses a FAISS flat index when faiss is installed, otherwise a growing
+    float32 matrix with amortized doubling.
+    """
+
+    def __init__(self, dim):
+        self.count = 0
+        if faiss is not None:
+            self.index = faiss.IndexFlatIP(dim)
+        else:
+            self.index = None
+            self.buffer = np.zeros((64, dim), dtype=np.float32)
+
+    def add(self, emb):
+        if self.index is not None:
+            self.index.add(emb[None, :])
+        else:
+            if self.count == len(self.buffer):
+                grown = np.zeros((len(self.buffer) * 2, self.buffer.shape[1]), dtype=np.float32)
+                grown[:self.count] = self.buffer
+                self.buffer = grown
+            self.buffer[self.count] = emb
+        self.count += 1
+
+    def max_similarity(self, emb):
+        if self.count == 0:
+            return -1.0
+        if self.index is not None:
+            sims, _ = self.index.search(emb[None, :], 1)
+            return float(sims[0][0])
+        return float(np.max(self.buffer[:self.count] @ emb))
+
+
+# =========================
+# STEP 1: VISUAL FILTER
+# =========================
+def filter_visual_duplicates(frame_paths, on_progress: ProgressFn = None):
+    selected = []
+    seen = None
+    report_every = max(1, len(frame_paths) // 20)
+
+    for i, path in enumerate(frame_paths):
+        if on_progress and i % report_every == 0:
+            pct = 40 + int(30 * i / len(frame_paths))  # map CLIP to 40–70%
+            on_progress(f"Comparing frames ({i}/{len(frame_paths)})…", pct)
+
+        emb = get_embedding(path)
+
+        if seen is None:
+            if CLIP_GLOBAL_DEDUP:
+                seen = EmbeddingIndex(emb.shape[0])
+            else:
+                seen = EmbeddingRing(CLIP_LOOKBACK, emb.shape[0])
+
+        if seen.max_similarity(emb) < CLIP_THRESHOLD:
+            selected.append(path)
+            seen.add(emb)
+
+    logger.debug("clip filter done", extra={"frames_in": len(frame_paths), "frames_out": len(selected)})
+    return selected
+
+
+# =========================
+# OCR TEXT EXTRACTION
+# =========================
+def detect_text_region(gray):
+    """Return the (x, y, w, h) box enclosing text-like regions, or None."""
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    # join characters into lines so each text line becomes one contour
+    line_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3))
+    connected = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, line_kernel)
+    contours, _ = cv2.findContours(
+        connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+    )
+
+    height, width = gray.shape
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        # text lines are wider than tall and not tiny specks
+        if w < 20 or h < 8 or w < h:
+            continue
+        boxes.append((x, y, x + w, y + h))
+
+    if not boxes:
+        return None
+
+    pad = 10
+    x0 = max(0, min(b[0] for b in boxes) - pad)
+    y0 = max(0, min(b[1] for b in boxes) - pad)
+    x1 = min(width, max(b[2] for b in boxes) + pad)
+    y1 = min(height, max(b[3] for b in boxes) + pad)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def prepare_for_ocr(img):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    if OCR_MAX_WIDTH and gray.shape[1] > OCR_MAX_WIDTH:
+        scale = OCR_MAX_WIDTH / gray.shape[1]
+        gray = cv2.resize(
+            gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+
+    if OCR_CROP_TEXT:
+        region = detect_text_region(gray)
+        if region is None:
+            return None
+        x, y, w, h = region
+        gray = gray[y:y + h, x:x + w]
+
+    if OCR_BINARIZE:
+        _, gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    return gray
+
+
+def extract_text(image_path):
+    img = cv2.imread(image_path)
+    prepared = prepare_for_ocr(img)
+    if prepared is None:
+        return ""
+    text = pytesseract.image_to_string(prepared)
+    return text.strip()
+
+
+def image_hash(image_path):
+    """Hash frame bytes together with OCR settings that change the result."""
+    h = hashlib.sha1()
+    h.update(f"{OCR_MAX_WIDTH}|{OCR_BINARIZE}|{OCR_CROP_TEXT}".encode())
+    with open(image_path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def _ocr_cache_path(key):
+    return os.path.join(OCR_CACHE_DIR, f"{key}.txt")
+
+
+def load_ocr_cache(keys):
+    """Cached OCR text for the given hashes; hits are touched so eviction
+    drops the least recently used entries."""
+    cache = {}
+    for key in keys:
+        path = _ocr_cache_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cache[key] = f.read()
+            os.utime(path)
+        except OSError:
+            continue
+    return cache
+
+
+_ocr_cache_lock = threading.Lock()
+
+
+def save_ocr_cache(new_entries):
+    """Write one file per entry (atomically, jobs may finish concurrently),
+    then evict down to OCR_CACHE_MAX_ENTRIES."""
+    os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+    for key, text in new_entries.items():
+        path = _ocr_cache_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    _prune_ocr_cache()
+
+
+def _prune_ocr_cache():
+    with _ocr_cache_lock:
+        entries = []
+        with os.scandir(OCR_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".txt"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        continue
+        excess = len(entries) - OCR_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        logger.debug("ocr cache pruned", extra={"removed": excess})
+
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def _init_ocr_worker():
+    # each tesseract process should use one core; the pool provides parallelism.
+    # Set here so only the OCR workers (and their tesseract children) see it.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def get_ocr_pool():
+    """One OCR process pool shared by all jobs, so OCR_WORKERS is a global cap.
+
+    Workers are spawned rather than forked because the server process is
+    multi-threaded (and may hold a CUDA context).
+    """
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+            )
+    return _ocr_pool
+
+
+def extract_texts(frame_paths):
+    """OCR frames in a bounded process pool, skipping frames already cached."""
+    hashes = [image_hash(path) for path in frame_paths]
+    cache = load_ocr_cache(set(hashes))
+
+    pending = {}
+    for path, key in zip(frame_paths, hashes):
+        if key not in cache:
+            pending.setdefault(key, path)
+
+    logger.debug("ocr", extra={"cached": len(frame_paths) - len(pending), "pending": len(pending)})
+
+    if pending:
+        keys = list(pending)
+        paths = [pending[k] for k in keys]
+        chunksize = max(1, len(paths) // (OCR_WORKERS * 4))
+
+        texts = get_ocr_pool().map(extract_text, paths, chunksize=chunksize)
+        new_entries = dict(zip(keys, texts))
+        cache.update(new_entries)
+        save_ocr_cache(new_entries)
+
+    return [cache[key] for key in hashes]
+
+
+def text_similarity(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+# =========================
+# STEP 2: TEXT FILTER
+# =========================
+def filter_text_duplicates(frame_paths):
+    selected = []
+    texts = []
+
+    for path, text in zip(frame_paths, extract_texts(frame_paths)):
+        # skip empty or low text frames
+        if len(text) < MIN_TEXT_LENGTH:
+            continue
+
+        if not texts:
+            selected.append(path)
+            texts.append(text)
+            continue
+
+        sims = [text_similarity(text, t) for t in texts]
+
+        max_sim = max(sims)
+
+        if max_sim > TEXT_SIM_THRESHOLD:
+            idx = sims.index(max_sim)
+
+            # keep longer (more complete slide)
+            if len(text) > len(texts[idx]):
+                selected[idx] = path
+                texts[idx] = text
+        else:
+            selected.append(path)
+            texts.append(text)
+
+    logger.debug("ocr filter done", extra={"frames_in": len(frame_paths), "frames_out": len(selected)})
+    return selected, texts
+
+
+# =========================
+# SAVE FINAL FRAMES
+# =========================
+def save_frames(frames, texts, work_dir: str) -> List[Dict]:
+    output_dir = os.path.join(work_dir, OUTPUT_DIR)
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    saved = []
+    for i, (frame, text) in enumerate(zip(frames, texts)):
+        filename = f"frame_{i:04d}.jpg"
+        shutil.copy(frame, os.path.join(output_dir, filename))
+        saved.append({
+            "index": i,
+            "timestamp": frame_timestamp(frame),
+            "file": filename,
+            "text": text,
+        })
+
+    logger.debug("frames saved", extra={"count": len(frames), "path": output_dir})
+    return saved
+
+
+def frame_file_path(work_dir: str, filename: str) -> str:
+    return os.path.join(work_dir, OUTPUT_DIR, os.path.basename(filename))
+
+
+# =========================
+# MAIN PIPELINE
+# =========================
+def dedup_frames(
+    all_frames: List[str],
+    work_dir: str,
+    mode: str = DEFAULT_FRAME_MODE,
+    on_progress: ProgressFn = None,
+) -> List[Dict]:
+    """Filter sampled frames down to unique slides and save them."""
+
+    # Step 1: visual filtering
+    frames = filter_visual_duplicates(all_frames, on_progress=on_progress)
+
+    # Step 2: text-based filtering (slides only)
+    if mode == "slides":
+        if on_progress:
+            on_progress(f"Reading text from {len(frames)} frames…", 72)
+        frames, texts = filter_text_duplicates(frames)
+    else:
+        texts = ["" for _ in frames]
+
+    # Save final frames
+    if on_progress:
+        on_progress(f"Saving {len(frames)} unique frames…", 96)
+    return save_frames(frames, texts, work_dir)
+
+
+def frames_from_video(
+    video_path: str,
+    work_dir: str,
+    mode: str = DEFAULT_FRAME_MODE,
+    on_progress: ProgressFn = None,
+) -> List[Dict]:
+    """Sample an already downloaded video and return its unique frames."""
+    try:
+        if on_progress:
+            on_progress("Extracting frames…", 32)
+        all_frames = extract_frames(video_path, work_dir)
+        return dedup_frames(all_frames, work_dir, mode=mode, on_progress=on_progress)
+    finally:
+        shutil.rmtree(os.path.join(work_dir, FRAME_DIR), ignore_errors=True)
+
+
+def generate_unique_frames(
+    url: str,
+    work_dir: str,
+    on_progress: ProgressFn = None,
+    mode: str = DEFAULT_FRAME_MODE,
+    timestamps: Optional[List[float]] = None,
+) -> List[Dict]:
+    """Return the unique frames of a video, saved under work_dir.
+
+    With `timestamps`, only those instants are grabbed by seeking into the
+    remote stream and nothing is downloaded. Otherwise the smallest stream
+    meeting the mode's height floor is downloaded and sampled at FPS.
+    Only the final frames are kept in work_dir.
+    """
+    if mode not in FRAME_MODES:
+        raise ValueError(f"Unknown frame mode: {mode}")
+    min_height = FRAME_MODES[mode]
+    os.makedirs(work_dir, exist_ok=True)
+
+    if timestamps:
+        if on_progress:
+            on_progress("Resolving video stream…", 5)
+        stream = resolve_stream(url, min_height)
+        duration = stream["duration"]
+        past_end = [t for t in timestamps if duration and t >= duration]
+        if past_end:
+            raise ValueError(
+                f"Timestamps past the end of the video ({duration}s): {sorted(past_end)[:5]}"
+            )
+        if on_progress:
+            on_progress(f"Extracting {len(timestamps)} frames…", 15)
+        try:
+            all_frames = extract_frames_at(
+                stream["url"], timestamps, work_dir, headers=stream["headers"]
+            )
+            saved = dedup_frames(all_frames, work_dir, mode=mode, on_progress=on_progress)
+        finally:
+            shutil.rmtree(os.path.join(work_dir, FRAME_DIR), ignore_errors=True)
+    else:
+        if on_progress:
+            on_progress("Downloading video…", 5)
+        video_path = download_video(
+            url, work_dir, min_height=min_height, on_progress=on_progress
+        )
+        try:
+            saved = frames_from_video(video_path, work_dir, mode=mode, on_progress=on_progress)
+        finally:
+            os.remove(video_path)
+
+    logger.info("unique frames ready", extra={"count": len(saved)})
+    return saved
+
+
+# =========================
+# BACKGROUND JOBS
+# =========================
+# CLIP/OCR are CPU heavy: only FRAME_JOB_CONCURRENCY jobs run at once and
+# the rest wait in the executor queue, leaving cores for transcript requests.
+frame_job_executor = ThreadPoolExecutor(
+    max_workers=FRAME_JOB_CONCURRENCY,
+    thread_name_prefix="frame-job",
+)
+
+
+def start_frame_job(
+    url: str,
+    mode: str = DEFAULT_FRAME_MODE,
+    timestamps: Optional[List[float]] = None,
+) -> Job:
+    return submit_job(
+        "frames",
+        lambda job: generate_unique_frames(
+            url,
+            job.work_dir,
+            on_progress=job.progress,
+            mode=mode,
+            timestamps=timestamps,
+        ),
+        frame_job_executor,
+    )
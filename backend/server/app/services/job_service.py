@@ -0,0 +1,137 @@
+import contextvars
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import JOB_DIR, JOB_TTL_SECONDS
+from app.core.log import elapsed_ms, get_logger, job_id
+
+logger = get_logger(__name__)
+
+
+# =========================
+# JOB STATE
+# =========================
+class Job:
+    """A background job with a working directory and a progress event log."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.percent = 0
+        self.message = "Queued"
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.work_dir = os.path.join(JOB_DIR, self.id)
+        self.events: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error")
+
+    def _emit(self, event: Dict):
+        with self._lock:
+            self.events.append(event)
+
+    def progress(self, message: str, percent: int):
+        self.message = message
+        self.percent = percent
+        self._emit({"type": "progress", "message": message, "percent": percent})
+
+    def finish(self, result):
+        self.result = result
+        self.status = "done"
+        self.percent = 100
+        self.finished_at = time.time()
+        self._emit({"type": "done", "job_id": self.id})
+
+    def fail(self, error: Exception):
+        self.error = str(error)
+        self.status = "error"
+        self.finished_at = time.time()
+        self._emit({"type": "error", "detail": self.error})
+
+    def events_since(self, index: int) -> Tuple[List[Dict], bool]:
+        """Events after position `index`, and whether the job has finished."""
+        with self._lock:
+            # the terminal event is appended after the status flips, so
+            # look at the log rather than self.status
+            finished = bool(self.events) and self.events[-1]["type"] in ("done", "error")
+            return self.events[index:], finished
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "percent": self.percent,
+            "message": self.message,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+# =========================
+# REGISTRY
+# =========================
+_jobs: Dict[str, Job] = {}
+_lock = threading.Lock()
+
+
+def _prune_jobs():
+    now = time.time()
+    with _lock:
+        expired = [
+            job for job in _jobs.values()
+            if job.finished_at and now - job.finished_at > JOB_TTL_SECONDS
+        ]
+        for job in expired:
+            del _jobs[job.id]
+
+    for job in expired:
+        shutil.rmtree(job.work_dir, ignore_errors=True)
+
+
+def submit_job(
+    kind: str,
+    fn: Callable[[Job], object],
+    executor: Executor,
+) -> Job:
+    """Run fn(job) on `executor`; the executor size is the concurrency limit."""
+    _prune_jobs()
+
+    job = Job(kind)
+    with _lock:
+        _jobs[job.id] = job
+
+    def run():
+        job_id.set(job.id)
+        job.status = "running"
+        os.makedirs(job.work_dir, exist_ok=True)
+        start = time.perf_counter()
+        try:
+            job.finish(fn(job))
+            logger.info("job finished", extra={"kind": kind, "duration_ms": elapsed_ms(start)})
+        except Exception as e:
+            job.fail(e)
+            logger.error("job failed", extra={"kind": kind, "duration_ms": elapsed_ms(start)}, exc_info=True)
+
+    # run in a copy of the caller's context so the job keeps its request_id
+    executor.submit(contextvars.copy_context().run, run)
+    return job
+
+
+def get_job(job_id: str, kind: Optional[str] = None) -> Optional[Job]:
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None or (kind and job.kind != kind):
+        return None
+    return job
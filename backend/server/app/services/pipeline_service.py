@@ -0,0 +1,195 @@
+import bisect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.config import DEFAULT_SEGMENT_SECONDS
+from app.core.executors import model_executor, submit
+from app.core.metrics import whisper_fallbacks
+from app.services.chapter_service import outline_chapters, title_chapters
+from app.services.frame_service import (
+    DEFAULT_FRAME_MODE,
+    FRAME_MODES,
+    ProgressFn,
+    download_video,
+    frame_job_executor,
+    frames_from_video,
+)
+from app.services.job_service import Job, submit_job
+from app.services.transcript_service import (
+    cache_transcript,
+    fetch_youtube_transcript,
+    transcribe_file,
+    transcript_cache,
+)
+from app.services.youtube_metadata import get_video_metadata
+from app.utils.transcript_merger import merge_segments
+
+
+# =========================
+# HELPERS
+# =========================
+def monotonic_progress(on_progress: ProgressFn) -> ProgressFn:
+    """Concurrent stages report overlapping percents; never go backwards."""
+    if not on_progress:
+        return None
+
+    lock = threading.Lock()
+    best = [0]
+
+    def report(message: str, percent: int):
+        with lock:
+            best[0] = max(best[0], percent)
+            on_progress(message, best[0])
+
+    return report
+
+
+def attach_frames_to_chapters(chapters: List[Dict], frames: List[Dict]) -> List[Dict]:
+    """Add each frame to the chapter whose time range contains it."""
+    starts = [c["start"] for c in chapters]
+
+    for chapter in chapters:
+        chapter["frames"] = []
+
+    if not chapters:
+        return chapters
+
+    for frame in frames:
+        idx = max(0, bisect.bisect_right(starts, frame["timestamp"]) - 1)
+        chapters[idx]["frames"].append(frame)
+
+    return chapters
+
+
+# =========================
+# MAIN PIPELINE
+# =========================
+def analyze_video(
+    video_id: str,
+    work_dir: str,
+    on_progress: ProgressFn = None,
+    mode: str = DEFAULT_FRAME_MODE,
+    segment_seconds: int = DEFAULT_SEGMENT_SECONDS,
+    title_mode: str = "llm",
+    target_chapters: Optional[int] = None,
+) -> Dict:
+    """Chapters with their key frames, from at most one video download.
+
+    Transcript chaptering and frame dedup run concurrently. If YouTube has
+    no transcript, the download includes audio and Whisper transcribes the
+    same file the frames are sampled from.
+    """
+    if mode not in FRAME_MODES:
+        raise ValueError(f"Unknown frame mode: {mode}")
+
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    on_progress = monotonic_progress(on_progress)
+
+    metadata = get_video_metadata(url)
+
+    # shared with /youtube/transcript: a video fetched or transcribed there
+    # is not fetched again
+    transcript = transcript_cache.get(video_id)
+    if transcript is None:
+        raw = fetch_youtube_transcript(video_id)
+        if raw:
+            transcript = cache_transcript(video_id, raw)
+
+    def transcribe_stage(video_path):
+        # Whisper takes a slot on the shared model pool like any request
+        raw = submit(model_executor, transcribe_file, video_path, on_progress=on_progress).result()
+        return cache_transcript(video_id, raw) if raw else None
+
+    def chapter_stage(transcript):
+        if not transcript:
+            raise ValueError("Transcript generation failed — both YouTube and Whisper returned empty results")
+
+        segments = merge_segments(transcript, window=segment_seconds)
+        if on_progress:
+            on_progress(f"Generating chapters from {len(segments)} segments…", 60)
+
+        # titles are skipped when the description already lists chapters,
+        # as on /youtube/chapters. Embeddings run on the model pool; the LLM
+        # call stays on this thread.
+        outline = submit(
+            model_executor,
+            outline_chapters,
+            segments,
+            metadata,
+            title_mode,
+            target_chapters,
+        ).result()
+        return segments, title_chapters(outline)
+
+    os.makedirs(work_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="analyze") as pool:
+        if transcript:
+            chapters_future = pool.submit(chapter_stage, transcript)
+            video_path = download_video(
+                url, work_dir, min_height=FRAME_MODES[mode], on_progress=on_progress
+            )
+        else:
+            whisper_fallbacks.inc()
+            video_path = download_video(
+                url,
+                work_dir,
+                min_height=FRAME_MODES[mode],
+                on_progress=on_progress,
+                with_audio=True,
+            )
+            chapters_future = pool.submit(
+                lambda: chapter_stage(transcribe_stage(video_path))
+            )
+
+        frames_future = pool.submit(
+            frames_from_video, video_path, work_dir, mode, on_progress
+        )
+
+        try:
+            segments, chapters = chapters_future.result()
+            frames = frames_future.result()
+        finally:
+            # wait for both stages to release the file before removing it
+            chapters_future.exception()
+            frames_future.exception()
+            os.remove(video_path)
+
+    if on_progress:
+        on_progress(f"Attaching {len(frames)} frames to {len(chapters)} chapters…", 98)
+
+    return {
+        "video_id": video_id,
+        "metadata": metadata,
+        "segment_seconds": segment_seconds,
+        "segments": segments,
+        "chapters": attach_frames_to_chapters(chapters, frames),
+    }
+
+
+# =========================
+# BACKGROUND JOBS
+# =========================
+def start_analysis_job(
+    video_id: str,
+    mode: str = DEFAULT_FRAME_MODE,
+    segment_seconds: int = DEFAULT_SEGMENT_SECONDS,
+    title_mode: str = "llm",
+    target_chapters: Optional[int] = None,
+) -> Job:
+    # shares the frame job executor: both are CLIP/OCR heavy
+    return submit_job(
+        "analysis",
+        lambda job: analyze_video(
+            video_id,
+            job.work_dir,
+            on_progress=job.progress,
+            mode=mode,
+            segment_seconds=segment_seconds,
+            title_mode=title_mode,
+            target_chapters=target_chapters,
+        ),
+        frame_job_executor,
+    )
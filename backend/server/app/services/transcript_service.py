@@ -1,23 +1,29 @@
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-from typing import List, Dict, Callable, Optional
-from app.utils.transcript_merger import merge_segments
+from youtube_transcript_api import TranscriptsDisabled, NoTranscriptFound
+from typing import AsyncIterator, List, Dict, Callable, Optional
+from app.utils.transcript_merger import merge_segments, iter_merged_segments
+from app.core.config import TEMP_DIR, TRANSCRIPT_CACHE_SIZE, TRANSCRIPT_CACHE_TTL, WHISPER_VERBOSE
+from app.core.log import get_logger
+from app.utils.transcript_client import ytt_api
+from app.core.executors import run_io, run_model
+from app.core.metrics import register_cache, timed, whisper_fallbacks
+from app.services import whisper_service
+from app.utils.transcript import Transcript
+from app.utils.ttl_cache import TTLCache
 
-import whisper
 import yt_dlp
 import os
 import uuid
 
-ytt_api = YouTubeTranscriptApi()
+logger = get_logger(__name__)
 
-print("🔄 Loading Whisper model...")
-whisper_model = whisper.load_model("base")
-print("✅ Whisper model loaded")
+transcript_cache = TTLCache(maxsize=TRANSCRIPT_CACHE_SIZE, ttl=TRANSCRIPT_CACHE_TTL)
+register_cache("transcript", transcript_cache)
 
-TEMP_DIR = os.path.join(os.getcwd(), "temp")
 os.makedirs(TEMP_DIR, exist_ok=True)
-print(f"📁 Temp directory ready: {TEMP_DIR}")
+logger.debug("temp directory ready", extra={"path": TEMP_DIR})
 
 
+@timed("audio_download")
 def download_audio(
     video_id: str,
     on_progress: Optional[Callable[[str, int], None]] = None,
@@ -30,7 +36,7 @@ def download_audio(
     filename = f"{uuid.uuid4()}.mp3"
     filepath = os.path.join(TEMP_DIR, filename)
 
-    print(f"⬇️  Downloading audio for video: {video_id}")
+    logger.debug("downloading audio", extra={"video_id": video_id})
     if on_progress:
         on_progress("Downloading audio…", 10)
 
@@ -46,7 +52,7 @@ def download_audio(
     ydl_opts = {
         "format": "bestaudio/best",
         "outtmpl": filepath,
-        "quiet": False,
+        "quiet": not WHISPER_VERBOSE,
         "progress_hooks": [ydl_progress_hook],
         "postprocessors": [
             {
@@ -70,7 +76,7 @@ def download_audio(
             )
 
     size_mb = os.path.getsize(filepath) / (1024 * 1024)
-    print(f"✅ Audio downloaded: {filepath} ({size_mb:.2f} MB)")
+    logger.debug("audio downloaded", extra={"video_id": video_id, "size_mb": round(size_mb, 2)})
 
     if on_progress:
         on_progress(f"Audio ready ({size_mb:.1f} MB), starting transcription…", 55)
@@ -78,38 +84,29 @@ def download_audio(
     return filepath
 
 
-def whisper_transcribe(
-    video_id: str,
+@timed("whisper_transcribe")
+def transcribe_file(
+    media_path: str,
     on_progress: Optional[Callable[[str, int], None]] = None,
 ) -> List[Dict]:
-    """Generate transcript using Whisper with optional progress callbacks."""
+    """Run Whisper on any ffmpeg-readable audio or video file.
 
-    print(f"🎙️  Starting Whisper transcription for video: {video_id}")
-    audio_path = download_audio(video_id, on_progress=on_progress)
+    The model tier follows the detected language and escalates on low
+    confidence (see whisper_service.transcribe).
+    """
 
     if on_progress:
         on_progress("Whisper is transcribing audio…", 58)
 
-    print(f"🔍 Transcribing audio through Whisper…")
-
-    # Whisper doesn't expose a native per-segment callback, but we can hook
-    # into its segment generator by using a custom progress approach.
-    # We run transcribe normally and emit a "still working" heartbeat at the end.
-    result = whisper_model.transcribe(
-        audio_path,
-        task="translate", 
-        verbose=True,
-    )
+    # Whisper has no per-segment callback; progress is reported per stage
+    # instead: silence skipped by VAD, the language and tier picked, and an
+    # escalation to the accurate tier if confidence is low.
+    result = whisper_service.transcribe(media_path, on_progress=on_progress)
 
     detected_lang = result.get("language", "unknown")
-    print(f"🌐 Detected language: {detected_lang}")
 
     if on_progress:
-        on_progress(f"Transcription done (lang: {detected_lang}), cleaning up…", 88)
-
-    print(f"🗑️  Removing temp audio file: {audio_path}")
-    os.remove(audio_path)
-    print(f"✅ Temp file removed")
+        on_progress(f"Transcription done (lang: {detected_lang}, {result['tier']} tier), cleaning up…", 88)
 
     segments = [
         {
@@ -120,7 +117,10 @@ def whisper_transcribe(
         for seg in result["segments"]
     ]
 
-    print(f"✅ Whisper generated {len(segments)} segments")
+    logger.info(
+        "whisper transcription finished",
+        extra={"language": detected_lang, "tier": result["tier"], "segments": len(segments)},
+    )
 
     if on_progress:
         on_progress(f"Generated {len(segments)} transcript segments", 92)
@@ -128,13 +128,28 @@ def whisper_transcribe(
     return segments
 
 
-def get_raw_transcript(
+def whisper_transcribe(
     video_id: str,
     on_progress: Optional[Callable[[str, int], None]] = None,
 ) -> List[Dict]:
-    """Get transcript from YouTube, with Whisper as fallback."""
+    """Generate transcript using Whisper with optional progress callbacks."""
+
+    logger.info("falling back to whisper", extra={"video_id": video_id})
+    whisper_fallbacks.inc()
+    audio_path = download_audio(video_id, on_progress=on_progress)
 
-    print(f"🔎 Attempting to fetch YouTube transcript for video: {video_id}")
+    try:
+        return transcribe_file(audio_path, on_progress=on_progress)
+    finally:
+        os.remove(audio_path)
+
+
+@timed("transcript_fetch")
+def fetch_youtube_transcript(
+    video_id: str,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> Optional[List]:
+    """Get the YouTube transcript, or None when there is none to use."""
 
     if on_progress:
         on_progress("Checking for YouTube transcript…", 5)
@@ -144,52 +159,163 @@ def get_raw_transcript(
         transcript = list(fetched)
 
         if transcript:
-            print(f"✅ YouTube transcript fetched: {len(transcript)} segments")
+            logger.debug("youtube transcript fetched", extra={"video_id": video_id, "segments": len(transcript)})
             if on_progress:
                 on_progress(f"Found YouTube transcript ({len(transcript)} segments)", 90)
             return transcript
         else:
-            print("⚠️  YouTube transcript empty. Falling back to Whisper…")
+            logger.info("youtube transcript empty", extra={"video_id": video_id})
             if on_progress:
                 on_progress("No YouTube transcript found, using Whisper…", 8)
 
     except (TranscriptsDisabled, NoTranscriptFound) as e:
-        print(f"⚠️  No YouTube transcript ({type(e).__name__}). Falling back to Whisper…")
+        logger.info("no youtube transcript", extra={"video_id": video_id, "reason": type(e).__name__})
         if on_progress:
             on_progress("No YouTube transcript available, using Whisper…", 8)
     except Exception as e:
-        print(f"⚠️  Unexpected error: {e}. Falling back to Whisper…")
+        logger.warning("youtube transcript fetch failed", extra={"video_id": video_id}, exc_info=True)
         if on_progress:
             on_progress("Transcript fetch failed, using Whisper…", 8)
 
-    return whisper_transcribe(video_id, on_progress=on_progress)
+    return None
 
 
-def get_segmented_transcript(
+def get_raw_transcript(
     video_id: str,
-    segment_seconds: int,
     on_progress: Optional[Callable[[str, int], None]] = None,
 ) -> List[Dict]:
-    """Get merged transcript segments with optional progress reporting."""
+    """Get transcript from YouTube, with Whisper as fallback."""
 
-    print(f"\n{'='*50}")
-    print(f"📼 Processing video: {video_id}")
-    print(f"⏱️  Segment window: {segment_seconds}s")
-    print(f"{'='*50}\n")
+    transcript = fetch_youtube_transcript(video_id, on_progress=on_progress)
+    if transcript:
+        return transcript
+
+    return whisper_transcribe(video_id, on_progress=on_progress)
 
-    transcript = get_raw_transcript(video_id, on_progress=on_progress)
 
+@timed("merge")
+def _merge_transcript(
+    transcript: List,
+    segment_seconds: int,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> List[Dict]:
     if not transcript:
         raise ValueError("❌ Transcript generation failed — both YouTube and Whisper returned empty results")
 
     if on_progress:
         on_progress(f"Merging {len(transcript)} segments into {segment_seconds}s windows…", 95)
 
-    print(f"🔗 Merging {len(transcript)} raw segments into {segment_seconds}s windows…")
     merged = merge_segments(transcript, window=segment_seconds)
-    print(f"✅ Merged into {len(merged)} segments")
+    logger.debug(
+        "transcript merged",
+        extra={"raw_segments": len(transcript), "segments": len(merged), "window": segment_seconds},
+    )
 
     if on_progress:
         on_progress(f"Transcript ready ({len(merged)} segments)", 99)
 
-    return merged
\ No newline at end of file
+    return merged
+
+
+def _log_segmented_request(video_id: str, segment_seconds: int):
+    logger.debug("segmented transcript requested", extra={"video_id": video_id, "window": segment_seconds})
+
+
+def get_segmented_transcript(
+    video_id: str,
+    segment_seconds: int,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> List[Dict]:
+    """Get merged transcript segments with optional progress reporting."""
+
+    _log_segmented_request(video_id, segment_seconds)
+    transcript = get_raw_transcript(video_id, on_progress=on_progress)
+    return _merge_transcript(transcript, segment_seconds, on_progress=on_progress)
+
+
+def cache_transcript(video_id: str, raw: List) -> Transcript:
+    """Parse raw segments and share them with later requests for the video."""
+    transcript = Transcript.from_segments(raw)
+    transcript_cache.set(video_id, transcript)
+    return transcript
+
+
+# =========================
+# ASYNC ENTRY POINTS
+# =========================
+async def get_raw_transcript_async(
+    video_id: str,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> List:
+    """get_raw_transcript for async routes.
+
+    The YouTube fetch runs on the I/O pool; only the Whisper fallback
+    (audio download + transcription) takes a slot on the model pool.
+    """
+    transcript = await run_io(fetch_youtube_transcript, video_id, on_progress)
+    if transcript:
+        return transcript
+
+    return await run_model(whisper_transcribe, video_id, on_progress)
+
+
+async def get_transcript_async(
+    video_id: str,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> Transcript:
+    """Time-indexed transcript for a video, cached by video_id.
+
+    Segmented and range requests for the same video reuse one parsed
+    Transcript (and its cached normalization) instead of refetching or
+    re-running Whisper.
+    """
+    transcript = transcript_cache.get(video_id)
+    if transcript is not None:
+        if on_progress:
+            on_progress(f"Using cached transcript ({len(transcript)} segments)", 90)
+        return transcript
+
+    raw = await get_raw_transcript_async(video_id, on_progress=on_progress)
+    if not raw:
+        raise ValueError("❌ Transcript generation failed — both YouTube and Whisper returned empty results")
+
+    return await run_io(cache_transcript, video_id, raw)
+
+
+async def get_segmented_transcript_async(
+    video_id: str,
+    segment_seconds: int,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> List[Dict]:
+    _log_segmented_request(video_id, segment_seconds)
+    transcript = await get_transcript_async(video_id, on_progress=on_progress)
+    return await run_io(_merge_transcript, transcript, segment_seconds, on_progress)
+
+
+async def iter_segmented_transcript_async(
+    transcript: Transcript,
+    segment_seconds: int,
+) -> AsyncIterator[Dict]:
+    """Merged segments one at a time; each window is merged on the I/O pool
+    so the event loop stays free and only one window is held in memory."""
+    segments = iter_merged_segments(transcript, window=segment_seconds)
+    while True:
+        segment = await run_io(next, segments, None)
+        if segment is None:
+            return
+        yield segment
+
+
+async def get_transcript_range_async(
+    video_id: str,
+    start: float,
+    end: float,
+) -> Dict:
+    """Segments starting in [start, end), for clients that lazy-load sections."""
+    transcript = await get_transcript_async(video_id)
+    section = transcript.time_range(start, end)
+    return {
+        "duration": round(transcript.duration, 3),
+        "total_segments": len(transcript),
+        "segments": section.to_dicts(),
+    }
@@ -0,0 +1,253 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import whisper
+
+from app.core.config import (
+    VAD_ENABLED,
+    VAD_MIN_SKIP_RATIO,
+    WHISPER_ACCURATE_MODEL,
+    WHISPER_BACKEND,
+    WHISPER_COMPUTE_TYPE,
+    WHISPER_DETECT_MODEL,
+    WHISPER_DETECT_SECONDS,
+    WHISPER_ENGLISH_CONFIDENCE,
+    WHISPER_FAST_MODEL,
+    WHISPER_MIN_LOGPROB,
+    WHISPER_NO_SPEECH,
+    WHISPER_STANDARD_MODEL,
+    WHISPER_VERBOSE,
+)
+from app.core.log import get_logger
+from app.core.metrics import (
+    timed,
+    whisper_audio_seconds,
+    whisper_compute_seconds,
+    whisper_escalations,
+    whisper_real_time_factor,
+    whisper_skipped_seconds,
+)
+from app.utils.vad import SpeechAudio, speech_regions
+
+try:
+    import faster_whisper
+except ImportError:
+    faster_whisper = None
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+# tier -> model name; "fast" only ever sees English audio
+TIERS = {
+    "fast": WHISPER_FAST_MODEL,
+    "standard": WHISPER_STANDARD_MODEL,
+    "accurate": WHISPER_ACCURATE_MODEL,
+}
+ESCALATE_TO = {"fast": "accurate", "standard": "accurate"}
+
+
+def use_faster() -> bool:
+    if WHISPER_BACKEND == "faster" and faster_whisper is None:
+        raise RuntimeError("WHISPER_BACKEND=faster but faster-whisper is not installed")
+    return WHISPER_BACKEND == "faster" or (WHISPER_BACKEND == "auto" and faster_whisper is not None)
+
+
+# =========================
+# MODELS
+# =========================
+models: Dict[str, object] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(name: str):
+    """Load a Whisper model on first use; most requests never need one."""
+    with _models_lock:
+        if name not in models:
+            backend = "faster" if use_faster() else "openai"
+            logger.info("loading whisper model", extra={"model": name, "backend": backend})
+            if backend == "faster":
+                models[name] = faster_whisper.WhisperModel(name, compute_type=WHISPER_COMPUTE_TYPE)
+            else:
+                models[name] = whisper.load_model(name)
+            logger.info("whisper model loaded", extra={"model": name, "backend": backend})
+        return models[name]
+
+
+def load_audio(media_path: str) -> np.ndarray:
+    """Decode any ffmpeg-readable file once to 16 kHz mono float32; every
+    tier and the language detection then share the same samples."""
+    return whisper.load_audio(media_path)
+
+
+# =========================
+# BACKENDS
+# =========================
+def _run(model, audio: np.ndarray, task: str, language: Optional[str]) -> Tuple[List[Dict], str]:
+    """Segments as dicts with start/end/text/avg_logprob/no_speech_prob,
+    and the language the model worked with."""
+    if use_faster():
+        # beam_size=1: greedy decoding, as openai-whisper does by default
+        segments, info = model.transcribe(audio, task=task, language=language, beam_size=1)
+        return [
+            {
+                "start": s.start,
+                "end": s.end,
+                "text": s.text,
+                "avg_logprob": s.avg_logprob,
+                "no_speech_prob": s.no_speech_prob,
+            }
+            for s in segments
+        ], info.language
+
+    result = model.transcribe(
+        audio,
+        task=task,
+        language=language,
+        # True prints every decoded segment; None silences the progress bar too
+        verbose=True if WHISPER_VERBOSE else None,
+    )
+    return result["segments"], result.get("language", language or "unknown")
+
+
+@timed("language_detect")
+def detect_language(audio: np.ndarray) -> Tuple[str, float]:
+    """(language, probability) from the first WHISPER_DETECT_SECONDS."""
+    model = load_model(WHISPER_DETECT_MODEL)
+    clip = audio[: WHISPER_DETECT_SECONDS * SAMPLE_RATE]
+
+    if use_faster():
+        # info is computed up front; the segment generator is never consumed
+        _, info = model.transcribe(clip, beam_size=1)
+        return info.language, info.language_probability
+
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), model.dims.n_mels)
+    _, probs = model.detect_language(mel.to(model.device))
+    language = max(probs, key=probs.get)
+    return language, probs[language]
+
+
+@timed("vad")
+def cut_silence(audio: np.ndarray) -> Optional[SpeechAudio]:
+    """The speech-only audio, or None when VAD is off or would skip too
+    little to be worth remapping timestamps."""
+    if not VAD_ENABLED:
+        return None
+
+    speech = SpeechAudio(audio, speech_regions(audio, SAMPLE_RATE), SAMPLE_RATE)
+    if speech.skipped_seconds < VAD_MIN_SKIP_RATIO * speech.original_seconds:
+        return None
+
+    whisper_skipped_seconds.inc(speech.skipped_seconds)
+    logger.info(
+        "vad skipped non-speech audio",
+        extra={
+            "audio_seconds": round(speech.original_seconds, 1),
+            "skipped_seconds": round(speech.skipped_seconds, 1),
+        },
+    )
+    return speech
+
+
+# =========================
+# TIERS
+# =========================
+def choose_tier(language: str, probability: float) -> str:
+    if language == "en" and probability >= WHISPER_ENGLISH_CONFIDENCE:
+        return "fast"
+    return "standard"
+
+
+def confidence(segments: List[Dict]) -> Optional[float]:
+    """Duration-weighted mean avg_logprob of the speech segments, or None
+    when there is no speech to judge."""
+    weights, logprobs = [], []
+    for seg in segments:
+        if seg["no_speech_prob"] > WHISPER_NO_SPEECH:
+            continue
+        weights.append(max(seg["end"] - seg["start"], 1e-3))
+        logprobs.append(seg["avg_logprob"])
+    if not weights:
+        return None
+    return float(np.average(logprobs, weights=weights))
+
+
+def run_tier(tier: str, audio: np.ndarray, task: str, language: Optional[str]):
+    """Transcribe with one tier and record its real-time factor."""
+    name = TIERS[tier]
+    model = load_model(name)
+    audio_seconds = len(audio) / SAMPLE_RATE
+
+    start = time.perf_counter()
+    with timed(f"whisper_{tier}"):
+        segments, language = _run(model, audio, task, language)
+    seconds = time.perf_counter() - start
+
+    whisper_audio_seconds.inc(audio_seconds, tier=tier)
+    whisper_compute_seconds.inc(seconds, tier=tier)
+    if audio_seconds:
+        whisper_real_time_factor.observe(seconds / audio_seconds, tier=tier, model=name)
+    return segments, language
+
+
+def transcribe(
+    media_path: str,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict:
+    """Transcribe to English with the cheapest tier that is confident.
+
+    Only the speech found by VAD is transcribed (so music intros and
+    breaks also don't reach the language detection); segment times are
+    mapped back to the original recording.
+
+    Returns {"segments", "language", "tier"}; segments carry start, end and
+    text like Whisper's own output. on_progress(message, percent) hears
+    about the VAD cut, the chosen tier and any escalation.
+    """
+    original = load_audio(media_path)
+    speech = cut_silence(original)
+    audio = original if speech is None else speech.audio
+    if not len(audio):
+        # nothing but silence: Whisper would only hallucinate
+        return {"segments": [], "language": "unknown", "tier": "skipped"}
+    if speech is not None and on_progress:
+        on_progress(f"Skipped {speech.skipped_seconds:.0f}s of silence and music…", 60)
+
+    detected, probability = detect_language(audio)
+    tier = choose_tier(detected, probability)
+    if on_progress:
+        on_progress(f"Detected language '{detected}', transcribing with the {tier} model…", 62)
+
+    # English needs no translation, and naming the language skips detection
+    task, language = ("transcribe", "en") if tier == "fast" else ("translate", None)
+    segments, language = run_tier(tier, audio, task, language)
+
+    score = confidence(segments)
+    if score is not None and score < WHISPER_MIN_LOGPROB and tier in ESCALATE_TO:
+        logger.info(
+            "whisper confidence low, escalating",
+            extra={"tier": tier, "avg_logprob": round(score, 3), "to": ESCALATE_TO[tier]},
+        )
+        whisper_escalations.inc(tier=tier)
+        tier = ESCALATE_TO[tier]
+        if on_progress:
+            on_progress(f"Low confidence, retrying with the {tier} model…", 75)
+        segments, language = run_tier(tier, audio, task, language)
+
+    if speech is not None:
+        segments = speech.remap(segments)
+
+    logger.info(
+        "whisper tier finished",
+        extra={
+            "tier": tier,
+            "model": TIERS[tier],
+            "detected_language": detected,
+            "language_probability": round(float(probability), 3),
+            "audio_seconds": round(len(original) / SAMPLE_RATE, 1),
+            "transcribed_seconds": round(len(audio) / SAMPLE_RATE, 1),
+        },
+    )
+    return {"segments": segments, "language": language, "tier": tier}
@@ -1,12 +1,76 @@
+import threading
+from typing import Dict, Optional
 import yt_dlp
+from app.core.config import METADATA_CACHE_SIZE, METADATA_CACHE_TTL
+from app.core.metrics import register_cache, timed
+from app.utils.ttl_cache import TTLCache
+from app.utils.video_id import extract_video_id
 
-def get_video_metadata(url: str):
-    with yt_dlp.YoutubeDL({"quiet": True, "skip_download": True}) as ydl:
-        info = ydl.extract_info(url, download=False)
+# Metadata only needs the extractor's raw info: skip DASH/HLS manifests and
+# the player JS used to decipher stream URLs.
+FAST_YDL_OPTS = {
+    "quiet": True,
+    "skip_download": True,
+    "extractor_args": {
+        "youtube": {
+            "skip": ["dash", "hls", "translated_subs"],
+            "player_skip": ["js"],
+        }
+    },
+}
+
+metadata_cache = TTLCache(maxsize=METADATA_CACHE_SIZE, ttl=METADATA_CACHE_TTL)
+register_cache("metadata", metadata_cache)
+
+# YoutubeDL instances are not thread-safe, so each worker thread reuses its own.
+_local = threading.local()
+
+
+def _get_extractor() -> yt_dlp.YoutubeDL:
+    ydl = getattr(_local, "ydl", None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(FAST_YDL_OPTS)
+        _local.ydl = ydl
+    return ydl
+
+
+def _pick_thumbnail(info: Dict, video_id: Optional[str]):
+    if info.get("thumbnail"):
+        return info["thumbnail"]
+
+    # unprocessed info only has the list, ordered worst → best
+    thumbnails = [t for t in info.get("thumbnails") or [] if t.get("url")]
+    if thumbnails:
+        return thumbnails[-1]["url"]
+
+    if video_id:
+        return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+    return None
+
+
+@timed("metadata_fetch")
+def extract_metadata(url: str, fast: bool = True):
+    """Run yt-dlp; `fast` skips format processing (process=False)."""
+    video_id = extract_video_id(url)
+
+    if fast:
+        info = _get_extractor().extract_info(url, download=False, process=False)
+    else:
+        with yt_dlp.YoutubeDL({"quiet": True, "skip_download": True}) as ydl:
+            info = ydl.extract_info(url, download=False)
 
     return {
         "title": info.get("title"),
         "description": info.get("description"),
-        "thumbnail": info.get("thumbnail"),
+        "thumbnail": _pick_thumbnail(info, video_id),
         "duration": info.get("duration")
     }
+
+
+def get_video_metadata(url: str, use_cache: bool = True):
+    if not use_cache:
+        return extract_metadata(url)
+
+    key = extract_video_id(url) or url
+    metadata = metadata_cache.get_or_set(key, lambda: extract_metadata(url))
+    return dict(metadata)
@@ -0,0 +1,110 @@
+import heapq
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# candidate splits evaluated per chunk; bounds temporaries to SPLIT_CHUNK x d
+SPLIT_CHUNK = 2048
+
+
+class ChangePoints:
+    """Top-down (binary segmentation) change points over a vector sequence.
+
+    The cost of a segment is its within-segment sum of squared distances to
+    the segment mean. Splitting [a, b) at t removes
+    |S_t - S_a|²/(t - a) + |S_b - S_t|²/(b - t) - |S_b - S_a|²/(b - a)
+    of it, where S are prefix sums of the vectors, so each candidate split
+    costs O(d) and no more than SPLIT_CHUNK rows of temporaries are ever
+    allocated.
+
+    Starting from the whole sequence, the segment whose best split removes
+    the most cost is split next; the order of splits is recorded once, so
+    the boundaries for any number of segments are a prefix of it and
+    coarser segmentations nest inside finer ones.
+
+    `times[i]` is the start time of item i; splits that would leave a side
+    shorter than `min_seconds` are not considered.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        times: Sequence[float],
+        end_time: float,
+        min_seconds: float,
+        max_splits: int,
+    ):
+        x = np.asarray(vectors, dtype=np.float64)
+        if x.size == 0:
+            # nothing to compare: every split has zero gain
+            x = np.zeros((len(times), 1))
+        norms = np.linalg.norm(x, axis=1, keepdims=True)
+        x = x / np.where(norms == 0, 1.0, norms)
+
+        self.n = len(x)
+        self.min_seconds = min_seconds
+        self.times = np.append(np.asarray(times, dtype=np.float64), end_time)
+        self._sum = np.zeros((self.n + 1, x.shape[1]))
+        np.cumsum(x, axis=0, out=self._sum[1:])
+        self._buf = np.empty((min(SPLIT_CHUNK, self.n), x.shape[1]))
+        # gains below this are rounding error (rows are unit vectors, so the
+        # total cost is at most n), not a change of topic
+        self._min_gain = 1e-9 * max(self.n, 1)
+
+        # (index, gain) in the order the splits were made
+        self.splits: List[Tuple[int, float]] = []
+        self._segment(max_splits)
+
+    def _sq_dist(self, ref: int, lo: int, hi: int) -> np.ndarray:
+        """|S_t - S_ref|² for t in [lo, hi), a chunk at a time in one buffer."""
+        out = np.empty(hi - lo)
+        for start in range(lo, hi, SPLIT_CHUNK):
+            stop = min(start + SPLIT_CHUNK, hi)
+            buf = self._buf[: stop - start]
+            np.subtract(self._sum[start:stop], self._sum[ref], out=buf)
+            np.multiply(buf, buf, out=buf)
+            buf.sum(axis=1, out=out[start - lo : stop - lo])
+        return out
+
+    def _best_split(self, a: int, b: int):
+        # times are sorted, so the splits leaving both sides long enough
+        # are one contiguous range
+        lo = max(a + 1, int(np.searchsorted(self.times, self.times[a] + self.min_seconds)))
+        hi = min(b, int(np.searchsorted(self.times, self.times[b] - self.min_seconds, side="right")))
+        if lo >= hi:
+            return None
+
+        t = np.arange(lo, hi)
+        gains = self._sq_dist(a, lo, hi) / (t - a)
+        gains += self._sq_dist(b, lo, hi) / (b - t)
+        whole = self._sum[b] - self._sum[a]
+        gains -= whole @ whole / (b - a)
+
+        best = int(np.argmax(gains))
+        return float(gains[best]), lo + best
+
+    def _segment(self, max_splits: int):
+        heap = []
+
+        def push(a, b):
+            found = self._best_split(a, b)
+            if found and found[0] > self._min_gain:
+                gain, t = found
+                heapq.heappush(heap, (-gain, t, a, b))
+
+        push(0, self.n)
+        while heap and len(self.splits) < max_splits:
+            neg_gain, t, a, b = heapq.heappop(heap)
+            self.splits.append((t, -neg_gain))
+            push(a, t)
+            push(t, b)
+
+    @property
+    def max_segments(self) -> int:
+        return len(self.splits) + 1
+
+    def boundaries(self, n_segments: int) -> List[int]:
+        """Sorted split indices giving `n_segments` segments (or as many as
+        the minimum length allows)."""
+        k = max(0, min(n_segments, self.max_segments) - 1)
+        return sorted(t for t, _ in self.splits[:k])
@@ -1,6 +1,22 @@
-from google import genai
 import os
+import threading
+
+from google import genai
 from dotenv import load_dotenv
 load_dotenv()
-# The client gets the API key from the environment variable `GEMINI_API_KEY`.
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Create the Gemini client on first use.
+
+    The client gets the API key from the environment variable `GEMINI_API_KEY`.
+    Tests and benchmarks can assign `client` beforehand to use a stand-in.
+    """
+    global client
+    with _client_lock:
+        if client is None:
+            client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return client
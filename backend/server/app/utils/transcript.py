@@ -0,0 +1,176 @@
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class Transcript:
+    """Columnar transcript: parallel float64 `start`/`end` arrays plus one
+    text buffer addressed by `offsets` (segment i is text[offsets[i]:offsets[i+1]]).
+
+    Compared with a list of dicts or FetchedTranscriptSnippet objects this
+    stores two floats and one offset per segment instead of a dict and three
+    boxed objects, and callers read fields without per-access type checks.
+
+    Segments built through from_segments/from_columns are sorted by start,
+    so time-range queries are binary searches over `start`.
+    """
+
+    __slots__ = ("start", "end", "offsets", "buffer", "_derived")
+
+    def __init__(self, start: np.ndarray, end: np.ndarray, buffer: str, offsets: np.ndarray):
+        self.start = start
+        self.end = end
+        self.buffer = buffer
+        self.offsets = offsets
+        self._derived: Dict[str, Any] = {}
+
+    # =========================
+    # CONSTRUCTION
+    # =========================
+    @classmethod
+    def from_columns(
+        cls,
+        starts: Sequence[float],
+        ends: Sequence[float],
+        texts: Sequence[str],
+    ) -> "Transcript":
+        # float64 so times compare and round exactly like the source floats
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+
+        if len(starts) > 1 and np.any(starts[1:] < starts[:-1]):
+            order = np.argsort(starts, kind="stable")
+            starts, ends = starts[order], ends[order]
+            texts = [texts[i] for i in order.tolist()]
+
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(starts, ends, "".join(texts), offsets)
+
+    @classmethod
+    def from_segments(cls, segments: Iterable) -> "Transcript":
+        """Build from dicts or objects with text/start and end or duration.
+
+        The segment shape is resolved once from the first element, so the
+        conversion loop does no per-segment dispatch.
+        """
+        if isinstance(segments, Transcript):
+            return segments
+
+        segments = list(segments)
+        if not segments:
+            return cls.empty()
+
+        first = segments[0]
+        if isinstance(first, dict):
+            texts = [s["text"] for s in segments]
+            starts = [s["start"] for s in segments]
+            if "end" in first:
+                ends = [s["end"] for s in segments]
+            else:
+                ends = [s["start"] + s["duration"] for s in segments]
+        else:
+            texts = [s.text for s in segments]
+            starts = [s.start for s in segments]
+            if hasattr(first, "end"):
+                ends = [s.end for s in segments]
+            else:
+                ends = [s.start + s.duration for s in segments]
+
+        return cls.from_columns(starts, ends, texts)
+
+    @classmethod
+    def empty(cls) -> "Transcript":
+        return cls(
+            np.zeros(0, dtype=np.float64),
+            np.zeros(0, dtype=np.float64),
+            "",
+            np.zeros(1, dtype=np.int64),
+        )
+
+    # =========================
+    # ACCESS
+    # =========================
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def text(self, i: int) -> str:
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+    def texts(self) -> List[str]:
+        buffer = self.buffer
+        bounds = self.offsets.tolist()
+        return [buffer[a:b] for a, b in zip(bounds, bounds[1:])]
+
+    def join_text(self, i: int, j: int, sep: str = " ") -> str:
+        """Texts of segments i..j-1 joined with `sep`."""
+        return sep.join(self[i:j].texts())
+
+    def __getitem__(self, key: slice) -> "Transcript":
+        if not isinstance(key, slice):
+            raise TypeError("Transcript only supports slicing; use text(i) and start/end[i]")
+
+        i, j, step = key.indices(len(self))
+        if step != 1:
+            raise ValueError("Transcript slices must be contiguous")
+        j = max(i, j)
+
+        a, b = int(self.offsets[i]), int(self.offsets[j])
+        return Transcript(
+            self.start[i:j],
+            self.end[i:j],
+            self.buffer[a:b],
+            self.offsets[i:j + 1] - a,
+        )
+
+    def to_dicts(self, duration: bool = False) -> List[Dict]:
+        """Segments as dicts with start/end, or start/duration like the
+        YouTube API. Times are rounded to milliseconds."""
+        starts = self.start.tolist()
+        ends = self.end.tolist()
+        if duration:
+            return [
+                {"text": text, "start": round(start, 3), "duration": round(end - start, 3)}
+                for start, end, text in zip(starts, ends, self.texts())
+            ]
+        return [
+            {"start": round(start, 3), "end": round(end, 3), "text": text}
+            for start, end, text in zip(starts, ends, self.texts())
+        ]
+
+    # =========================
+    # TIME INDEX
+    # =========================
+    def cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Memoize data derived from this transcript (it is never mutated)."""
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+
+    def index_after(self, t: float) -> int:
+        """Index of the first segment starting after t. O(log n)."""
+        return int(np.searchsorted(self.start, t, side="right"))
+
+    def index_range(self, t0: float, t1: float):
+        """[i, j) of the segments starting in [t0, t1). O(log n).
+
+        Ranges are by start time so consecutive windows tile the transcript
+        without repeating segments that straddle a window edge.
+        """
+        i = int(np.searchsorted(self.start, t0, side="left"))
+        j = int(np.searchsorted(self.start, t1, side="left"))
+        return i, max(i, j)
+
+    def time_range(self, t0: float, t1: float) -> "Transcript":
+        i, j = self.index_range(t0, t1)
+        return self[i:j]
+
+    @property
+    def duration(self) -> float:
+        return float(self.end.max()) if len(self) else 0.0
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and the text buffer."""
+        return self.start.nbytes + self.end.nbytes + self.offsets.nbytes + sys.getsizeof(self.buffer)
@@ -0,0 +1,136 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from youtube_transcript_api import YouTubeTranscriptApi
+
+from app.core.metrics import register_callback
+from app.core.config import (
+    TRANSCRIPT_POOL_SIZE,
+    TRANSCRIPT_RETRIES,
+    TRANSCRIPT_BACKOFF,
+    TRANSCRIPT_TIMEOUT,
+)
+
+
+# =========================
+# CONNECTION STATS
+# =========================
+class ConnectionStats:
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    def on_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def on_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            requests_, new = self.requests, self.new_connections
+        reused = max(requests_ - new, 0)
+        return {
+            "requests": requests_,
+            "new_connections": new,
+            "reuse_rate": round(reused / requests_, 4) if requests_ else 0.0,
+        }
+
+
+stats = ConnectionStats()
+
+register_callback(
+    "transcript_http_requests_total",
+    "Requests sent through the shared transcript session.",
+    "counter",
+    lambda: {(): stats.requests},
+)
+register_callback(
+    "transcript_http_new_connections_total",
+    "Connections opened by the shared transcript session; the rest reused keep-alive sockets.",
+    "counter",
+    lambda: {(): stats.new_connections},
+)
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        stats.on_new_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        stats.on_new_connection()
+        return super()._new_conn()
+
+
+# =========================
+# SESSION
+# =========================
+class PooledAdapter(HTTPAdapter):
+    """Keep-alive adapter that counts requests and newly opened connections."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        stats.on_request()
+        return super().send(request, **kwargs)
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session with a default timeout for every request."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session(
+    pool_size: int = TRANSCRIPT_POOL_SIZE,
+    retries: int = TRANSCRIPT_RETRIES,
+    backoff: float = TRANSCRIPT_BACKOFF,
+    timeout=TRANSCRIPT_TIMEOUT,
+) -> requests.Session:
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),
+        # the innertube player request is a POST but safe to repeat
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    )
+    adapter = PooledAdapter(
+        pool_connections=4,          # youtube.com, www.youtube.com, …
+        pool_maxsize=pool_size,      # keep-alive sockets per host
+        max_retries=retry,
+    )
+
+    session = TimeoutSession(timeout)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# One client for the whole process so every fetch reuses warm TLS connections.
+session = build_session()
+ytt_api = YouTubeTranscriptApi(http_client=session)
+
+
+def connection_stats():
+    return stats.snapshot()
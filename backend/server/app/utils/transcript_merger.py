@@ -1,9 +1,9 @@
-from youtube_transcript_api import YouTubeTranscriptApi
-from typing import List, Dict
+from typing import Dict, Iterator, List
 from .filler_words import FILLER_WORDS
+from .transcript_client import ytt_api
+from .transcript import Transcript
 import re
 
-ytt_api = YouTubeTranscriptApi()
 
 
 
@@ -38,52 +38,55 @@ def format_transcript_with_punctuation(text: str) -> str:
     
     return text
 
-def merge_segments(segments: List, window: int = 60) -> List[Dict]:
-    """Merge transcript segments into time-based windows — supports both objects and dicts"""
-    if not segments:
-        return []
-
-    def get_field(seg, field):
-        """Handle both dict segments (Whisper) and object segments (YouTube)"""
-        if isinstance(seg, dict):
-            return seg[field]
-        return getattr(seg, field)
-
-    merged = []
-    bucket = []
-    bucket_start = get_field(segments[0], "start")
-    bucket_end = bucket_start + window
-
-    for seg in segments:
-        cleaned_text = normalize_transcript_text(get_field(seg, "text"))
-
-        if get_field(seg, "start") <= bucket_end:
-            bucket.append(cleaned_text)
-        else:
-            combined_text = " ".join(bucket)
-            formatted_text = format_transcript_with_punctuation(combined_text)
-
-            merged.append({
-                "start": round(bucket_start, 2),
-                "end": round(bucket_end, 2),
-                "text": formatted_text
-            })
-
-            bucket_start = get_field(seg, "start")
-            bucket_end = bucket_start + window
-            bucket = [cleaned_text]
-
-    if bucket:
-        combined_text = " ".join(bucket)
+def normalized_texts(transcript: Transcript, i: int, j: int) -> List[str]:
+    """Normalized text of segments i..j-1.
+
+    Normalization is filled in lazily per window and kept on the
+    Transcript, so streaming starts immediately and re-bucketing the same
+    transcript with another window size never normalizes a segment twice.
+    """
+    cache = transcript.cached("normalized", lambda: [None] * len(transcript))
+    for k in range(i, j):
+        if cache[k] is None:
+            cache[k] = normalize_transcript_text(transcript.text(k))
+    return cache[i:j]
+
+
+def iter_merged_segments(segments, window: int = 60) -> Iterator[Dict]:
+    """Yield transcript segments merged into time-based windows, one
+    window at a time as soon as it closes.
+
+    Accepts a Transcript or anything Transcript.from_segments understands
+    (Whisper dicts, YouTube snippet objects). Each window is found with a
+    binary search on start times.
+    """
+    transcript = Transcript.from_segments(segments)
+    starts = transcript.start
+
+    i = 0
+    while i < len(transcript):
+        bucket_start = float(starts[i])
+        bucket_end = bucket_start + window
+
+        # the bucket takes every following segment starting at or before its
+        # end, and always its first one (so a window <= 0 still advances)
+        j = max(transcript.index_after(bucket_end), i + 1)
+
+        combined_text = " ".join(normalized_texts(transcript, i, j))
         formatted_text = format_transcript_with_punctuation(combined_text)
 
-        merged.append({
+        yield {
             "start": round(bucket_start, 2),
             "end": round(bucket_end, 2),
             "text": formatted_text
-        })
+        }
+
+        i = j
+
 
-    return merged
+def merge_segments(segments, window: int = 60) -> List[Dict]:
+    """Merge transcript segments into time-based windows."""
+    return list(iter_merged_segments(segments, window=window))
 
 def get_raw_transcript(video_id: str) -> List[Dict]:
     """Get raw transcript as list of dicts"""
@@ -0,0 +1,151 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.config import (
+    VAD_AGGRESSIVENESS,
+    VAD_ENERGY_DB,
+    VAD_FRAME_MS,
+    VAD_MIN_SILENCE,
+    VAD_MIN_SPEECH,
+    VAD_PAD,
+)
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+# quieter than this (dBFS) is never speech, whatever the noise floor
+SILENCE_DBFS = -50.0
+
+Region = Tuple[int, int]   # [start, end) in samples
+
+
+# =========================
+# FRAME DECISIONS
+# =========================
+def _frames(audio: np.ndarray, frame: int) -> np.ndarray:
+    n = len(audio) // frame
+    return audio[: n * frame].reshape(n, frame)
+
+
+def energy_speech_frames(audio: np.ndarray, frame: int) -> np.ndarray:
+    """Frames louder than the noise floor (10th percentile) by VAD_ENERGY_DB."""
+    frames = _frames(audio, frame)
+    if not len(frames):
+        return np.zeros(0, dtype=bool)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    threshold = max(np.percentile(db, 10) + VAD_ENERGY_DB, SILENCE_DBFS)
+    return db > threshold
+
+
+def webrtc_speech_frames(audio: np.ndarray, frame: int, sample_rate: int) -> np.ndarray:
+    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    frames = _frames(pcm, frame)
+    return np.fromiter(
+        (vad.is_speech(f.tobytes(), sample_rate) for f in frames),
+        dtype=bool,
+        count=len(frames),
+    )
+
+
+def speech_frames(audio: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+    """Per-frame speech decisions and the frame length in samples."""
+    frame = sample_rate * VAD_FRAME_MS // 1000
+    if webrtcvad is not None:
+        return webrtc_speech_frames(audio, frame, sample_rate), frame
+    return energy_speech_frames(audio, frame), frame
+
+
+# =========================
+# REGIONS
+# =========================
+def _runs(flags: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) of every run of True."""
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def speech_regions(audio: np.ndarray, sample_rate: int) -> List[Region]:
+    """Speech regions of 16 kHz mono audio, in samples.
+
+    Pauses shorter than VAD_MIN_SILENCE are kept inside a region, bursts
+    shorter than VAD_MIN_SPEECH are dropped, and every region is padded by
+    VAD_PAD so word onsets and endings are not clipped.
+    """
+    flags, frame = speech_frames(audio, sample_rate)
+    seconds_per_frame = frame / sample_rate
+
+    # close short pauses
+    max_gap = int(VAD_MIN_SILENCE / seconds_per_frame)
+    merged: List[List[int]] = []
+    for a, b in _runs(flags):
+        if merged and a - merged[-1][1] < max_gap:
+            merged[-1][1] = b
+        else:
+            merged.append([a, b])
+
+    min_len = int(VAD_MIN_SPEECH / seconds_per_frame)
+    pad = int(VAD_PAD * sample_rate)
+    regions: List[Region] = []
+    for a, b in merged:
+        if b - a < min_len:
+            continue
+        start = max(a * frame - pad, 0)
+        end = min(b * frame + pad, len(audio))
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+# =========================
+# TIMESTAMP REMAPPING
+# =========================
+class SpeechAudio:
+    """The speech regions of a recording cut into one contiguous array,
+    with the mapping from its timeline back to the original one."""
+
+    def __init__(self, audio: np.ndarray, regions: List[Region], sample_rate: int):
+        self.sample_rate = sample_rate
+        self.original_seconds = len(audio) / sample_rate
+        self.audio = (
+            np.concatenate([audio[a:b] for a, b in regions])
+            if regions
+            else np.zeros(0, dtype=audio.dtype)
+        )
+
+        lengths = np.array([b - a for a, b in regions], dtype=np.int64)
+        # where each region starts in the cut audio and in the original, in seconds
+        self._cut_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / sample_rate
+        self._orig_starts = np.array([a for a, _ in regions], dtype=np.float64) / sample_rate
+        self._lengths = lengths / sample_rate
+
+    @property
+    def speech_seconds(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def skipped_seconds(self) -> float:
+        return self.original_seconds - self.speech_seconds
+
+    def to_original(self, t: float, end: bool = False) -> float:
+        """Original time of cut-audio time t. An `end` exactly on a region
+        join maps to the end of the earlier region, not the later start."""
+        if not len(self._lengths):
+            return t
+        side = "left" if end else "right"
+        i = max(int(np.searchsorted(self._cut_starts, t, side=side)) - 1, 0)
+        offset = min(t - self._cut_starts[i], self._lengths[i])
+        return float(self._orig_starts[i] + offset)
+
+    def remap(self, segments: List[dict]) -> List[dict]:
+        """Segments with start/end moved back onto the original timeline."""
+        for seg in segments:
+            seg["start"] = self.to_original(seg["start"])
+            seg["end"] = max(self.to_original(seg["end"], end=True), seg["start"])
+        return segments
@@ -0,0 +1,102 @@
+"""Request throughput with the old print-based output vs structured logging.
+
+Each simulated request merges a synthetic transcript and emits what the
+service used to print for it: the per-request banner, milestone lines and
+(for a Whisper fallback with verbose=True) one line per decoded segment.
+"print" writes that to stdout; "logging" routes the same events through
+the app loggers at the default INFO level, where the per-segment and
+milestone lines are debug and therefore dropped.
+
+Output goes to a real file so writes cost what a container log pipe does.
+
+Run from backend/server:
+
+    python -m benchmarks.bench_logging --requests 200 --concurrency 16
+"""
+import argparse
+import contextlib
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.log import get_logger, setup_logging
+from app.utils.transcript import Transcript
+from app.utils.transcript_merger import merge_segments
+from benchmarks.common import print_table, summarize, synthetic_snippets
+
+logger = get_logger("app.bench")
+
+
+def request_print(transcript: Transcript, window: int):
+    print(f"\n{'=' * 50}")
+    print("📼 Processing video: bench")
+    print(f"⏱️  Segment window: {window}s")
+    print(f"{'=' * 50}\n")
+    for start, end, text in zip(transcript.start.tolist(), transcript.end.tolist(), transcript.texts()):
+        print(f"[{start:.3f} --> {end:.3f}] {text}")
+    print(f"🔗 Merging {len(transcript)} raw segments into {window}s windows…")
+    merged = merge_segments(transcript, window=window)
+    print(f"✅ Merged into {len(merged)} segments")
+
+
+def request_logging(transcript: Transcript, window: int):
+    logger.debug("segmented transcript requested", extra={"video_id": "bench", "window": window})
+    if logger.isEnabledFor(logging.DEBUG):
+        for start, end, text in zip(transcript.start.tolist(), transcript.end.tolist(), transcript.texts()):
+            logger.debug("whisper segment", extra={"start": start, "end": end, "text": text})
+    merged = merge_segments(transcript, window=window)
+    logger.debug("transcript merged", extra={"segments": len(merged), "window": window})
+    logger.info("whisper transcription finished", extra={"segments": len(transcript)})
+
+
+def run(mode, snippets, window, requests, concurrency, log_file):
+    if mode == "logging":
+        logging.getLogger("app").handlers[0].setStream(log_file)
+
+    def one():
+        start = time.perf_counter()
+        # a fresh Transcript per request, so no run reuses another's normalization
+        transcript = Transcript.from_segments(snippets)
+        if mode == "print":
+            request_print(transcript, window)
+        else:
+            request_logging(transcript, window)
+        return time.perf_counter() - start
+
+    with contextlib.redirect_stdout(log_file):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(lambda _: one(), range(requests)))
+        wall = time.perf_counter() - started
+
+    log_file.flush()
+    row = summarize(mode, latencies)
+    row["req_per_s"] = round(requests / wall, 1)
+    row["log_kb"] = round(os.path.getsize(log_file.name) / 1024, 1)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--window", type=int, default=60)
+    args = parser.parse_args()
+
+    setup_logging("INFO")
+    snippets = synthetic_snippets(args.minutes * 60)
+
+    rows = []
+    for mode in ("print", "logging"):
+        with tempfile.NamedTemporaryFile("w", suffix=".log", encoding="utf-8") as log_file:
+            rows.append(run(mode, snippets, args.window, args.requests, args.concurrency, log_file))
+
+    print(f"{len(snippets)} segments per request, {args.concurrency} concurrent")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
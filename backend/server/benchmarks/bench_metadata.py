@@ -0,0 +1,51 @@
+"""Latency of /youtube/metadata lookups: full vs fast extraction, cold vs warm.
+
+Hits YouTube, so numbers depend on the network. Run from backend/server:
+
+    python -m benchmarks.bench_metadata --videos 10 --repeat 5
+"""
+import argparse
+import time
+
+from app.services import youtube_metadata
+from benchmarks.common import load_dataset_videos, print_table, summarize
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5, help="warm calls per video")
+    args = parser.parse_args()
+
+    urls = [
+        f"https://www.youtube.com/watch?v={row['video_id']}"
+        for row in load_dataset_videos(args.videos)
+    ]
+
+    full, fast_cold, warm = [], [], []
+    for url in urls:
+        full.append(timed(youtube_metadata.extract_metadata, url, fast=False))
+
+    youtube_metadata.metadata_cache.clear()
+    for url in urls:
+        fast_cold.append(timed(youtube_metadata.get_video_metadata, url))
+
+    for _ in range(args.repeat):
+        for url in urls:
+            warm.append(timed(youtube_metadata.get_video_metadata, url))
+
+    print_table([
+        summarize("full extract_info (old path)", full),
+        summarize("fast path, cold cache", fast_cold),
+        summarize("fast path, warm cache", warm),
+    ])
+
+
+if __name__ == "__main__":
+    main()
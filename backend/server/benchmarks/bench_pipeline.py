@@ -0,0 +1,195 @@
+"""Offline timing of the transcript → chapters pipeline, stage by stage.
+
+Fixtures are real caption tracks cut to 10 min – 5 h (--minutes): the
+bundled backend/transcript.txt, plus any benchmarks/captions/<video_id>.txt
+(see common.pipeline_fixtures). The LLM is replaced by a stub that answers
+instantly (or after --llm-latency seconds), so no network is used; the
+sentence-transformer model does run, on whatever device it picks.
+
+For every fixture length and stage it reports the best-of-N time,
+throughput in input segments per second and the peak Python heap
+(tracemalloc, so tensor memory owned by torch is not included).
+
+Baselines live in benchmarks/baselines.json and are machine specific:
+
+    python -m benchmarks.bench_pipeline --save-baseline     # record
+    python -m benchmarks.bench_pipeline --check             # exit 1 on regression
+
+Run from backend/server.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from app.services import chapter_service
+from app.utils import gemini
+from app.utils.transcript import Transcript
+from app.utils.transcript_merger import merge_segments, normalize_transcript_text
+from benchmarks.common import FIXTURE_MINUTES, pipeline_fixtures, print_table
+from benchmarks.fakes import StubLLM
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+STAGES = ("normalize", "merge", "sentence_split", "embedding", "boundaries", "titles")
+
+
+# =========================
+# STAGES
+# =========================
+def build_stages(fixture: Dict, window: int) -> List[tuple]:
+    """(name, fn(state), items(state)) in pipeline order.
+
+    Each stage reads what the previous one produced from `state`.
+    """
+    model = chapter_service.load_model()
+
+    def normalize(state):
+        state["normalized"] = [normalize_transcript_text(s["text"]) for s in fixture["snippets"]]
+
+    def merge(state):
+        # a fresh Transcript so no normalization is reused between runs
+        state["merged"] = merge_segments(Transcript.from_segments(fixture["snippets"]), window=window)
+
+    def sentence_split(state):
+        state["sentences"] = chapter_service.split_into_sentences(state["merged"])
+
+    def embedding(state):
+        texts = chapter_service.build_windows(state["sentences"])
+        state["embeddings"] = model.encode(texts, show_progress_bar=False)
+
+    def boundaries(state):
+        similarities = chapter_service.compute_similarity(state["embeddings"])
+        state["boundaries"] = chapter_service.detect_boundaries(similarities, state["sentences"])
+
+    def titles(state):
+        vectors = chapter_service.sentence_vectors(state["embeddings"], len(state["sentences"]))
+        chapters = chapter_service.build_chapters(state["boundaries"], state["sentences"], vectors)
+        state["titles"] = chapter_service.generate_chapter_titles(chapters, {"title": fixture["title"]})
+
+    return [
+        ("normalize", normalize, lambda s: len(fixture["snippets"])),
+        ("merge", merge, lambda s: len(fixture["snippets"])),
+        ("sentence_split", sentence_split, lambda s: len(s["merged"])),
+        ("embedding", embedding, lambda s: len(s["sentences"])),
+        ("boundaries", boundaries, lambda s: len(s["sentences"])),
+        ("titles", titles, lambda s: len(s["boundaries"]) + 1),
+    ]
+
+
+def _needed(stages) -> set:
+    """Earlier stages whose output a selected stage depends on."""
+    order = list(STAGES)
+    last = max((order.index(s) for s in stages), default=-1)
+    # normalize is standalone; everything from merge on is a chain
+    return set(order[1:last + 1]) if last >= 1 else set()
+
+
+def run_fixture(fixture: Dict, window: int, repeat: int, stages) -> List[Dict]:
+    wanted = set(stages) | _needed(stages)
+    pipeline = [s for s in build_stages(fixture, window) if s[0] in wanted]
+
+    best = {name: float("inf") for name, _, _ in pipeline}
+    state: Dict = {}
+    for _ in range(repeat):
+        state = {}
+        for name, fn, _ in pipeline:
+            start = time.perf_counter()
+            fn(state)
+            best[name] = min(best[name], time.perf_counter() - start)
+
+    peaks = {}
+    state = {}
+    for name, fn, _ in pipeline:
+        gc.collect()
+        tracemalloc.start()
+        fn(state)
+        peaks[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    rows = []
+    for name, _, items in pipeline:
+        if name not in stages:
+            continue
+        n = items(state)
+        rows.append({
+            "fixture": fixture["name"],
+            "minutes": fixture["minutes"],
+            "stage": name,
+            "items": n,
+            "seconds": round(best[name], 4),
+            "items_per_s": round(n / best[name], 1) if best[name] else float("inf"),
+            "peak_mb": round(peaks[name] / (1024 * 1024), 2),
+        })
+    return rows
+
+
+# =========================
+# BASELINES
+# =========================
+def load_baselines() -> Dict[str, float]:
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(rows: List[Dict]):
+    baselines = load_baselines()
+    baselines.update({f"{r['fixture']}/{r['stage']}": r["seconds"] for r in rows})
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(rows: List[Dict], baselines: Dict[str, float], tolerance: float) -> int:
+    """Annotate rows with the change vs baseline; return the regression count."""
+    regressions = 0
+    for row in rows:
+        base = baselines.get(f"{row['fixture']}/{row['stage']}")
+        if not base:
+            row["vs_baseline"] = "-"
+            continue
+        ratio = row["seconds"] / base
+        row["vs_baseline"] = f"{ratio:.2f}x"
+        if ratio > 1 + tolerance:
+            row["vs_baseline"] += " REGRESSION"
+            regressions += 1
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, nargs="+", default=list(FIXTURE_MINUTES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any stage regressed")
+    args = parser.parse_args()
+
+    gemini.client = StubLLM(args.llm_latency)
+
+    rows = []
+    for fixture in pipeline_fixtures(args.minutes):
+        rows.extend(run_fixture(fixture, args.window, args.repeat, set(args.stages)))
+
+    regressions = compare(rows, load_baselines(), args.tolerance)
+    print_table(rows)
+
+    if args.save_baseline:
+        save_baselines(rows)
+        print(f"Baselines written to {BASELINE_FILE}")
+    elif regressions:
+        print(f"{regressions} stage(s) slower than baseline by more than {args.tolerance:.0%}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Encode time and bytes-on-wire for a 3-hour raw transcript response.
+
+Compares FastAPI's default path for a returned dict (jsonable_encoder,
+then JSONResponse.render) with app.core.responses.encode_payload (orjson,
+or msgpack when accepted), each uncompressed, gzip and brotli.
+msgpack/brotli rows are skipped when the packages are not installed.
+
+Run from backend/server:
+
+    python -m benchmarks.bench_serialization --hours 3
+"""
+import argparse
+import gzip
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import BROTLI_QUALITY, GZIP_LEVEL
+from app.core.responses import MSGPACK_TYPES, encode_payload
+from app.utils.transcript import Transcript
+from benchmarks.common import print_table, synthetic_snippets
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    transcript = Transcript.from_segments(synthetic_snippets(args.hours * 3600))
+    payload = {"video_id": "x" * 11, "transcript": transcript.to_dicts(duration=True)}
+
+    encoders = {
+        # what FastAPI does with a dict returned from a route (no response_model)
+        "fastapi default": lambda: JSONResponse(jsonable_encoder(payload)).body,
+        "orjson": lambda: encode_payload(payload)[0],
+    }
+    if msgpack is not None:
+        encoders["msgpack"] = lambda: encode_payload(payload, MSGPACK_TYPES[0])[0]
+
+    compressors = {"identity": None, "gzip": lambda b: gzip.compress(b, compresslevel=GZIP_LEVEL)}
+    if brotli is not None:
+        compressors["br"] = lambda b: brotli.compress(b, quality=BROTLI_QUALITY)
+
+    rows = []
+    for enc_name, encode in encoders.items():
+        body, encode_s = best_of(encode, args.repeat)
+        for comp_name, comp in compressors.items():
+            if comp is None:
+                wire, comp_s = body, 0.0
+            else:
+                wire, comp_s = best_of(lambda: comp(body), args.repeat)
+            rows.append({
+                "encoder": enc_name,
+                "compression": comp_name,
+                "encode_ms": round(encode_s * 1000, 2),
+                "compress_ms": round(comp_s * 1000, 2),
+                "total_ms": round((encode_s + comp_s) * 1000, 2),
+                "bytes": len(wire),
+            })
+
+    print(f"{len(transcript)} segments")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
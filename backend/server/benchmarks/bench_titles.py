@@ -0,0 +1,96 @@
+"""Keyword (TF-IDF) titles vs LLM titles: latency and word overlap.
+
+Chapters come from the real pipeline on the caption fixtures of each
+length (common.pipeline_fixtures), with the sentence model unless
+--fake-embeddings is given. Both title modes then title the same chapters.
+
+Overlap is the mean token F1 between the two titles of each chapter
+(lowercased, stop words dropped). It needs real LLM output: set
+GEMINI_API_KEY; with --stub-llm only latency is meaningful.
+
+Run from backend/server:
+
+    python -m benchmarks.bench_titles --minutes 30 60 120
+"""
+import argparse
+import os
+import re
+import time
+from typing import List
+
+from app.services import chapter_service
+from app.utils import gemini
+from app.utils.transcript_merger import merge_segments
+from benchmarks.common import pipeline_fixtures, print_table
+from benchmarks.fakes import FakeEncoder, StubLLM
+
+_STOP = set(chapter_service._KEYWORD_STOP_WORDS)
+
+
+def title_tokens(title: str) -> set:
+    return {w for w in re.findall(r"[a-z']+", title.lower()) if w not in _STOP}
+
+
+def token_f1(a: str, b: str) -> float:
+    ta, tb = title_tokens(a), title_tokens(b)
+    if not ta or not tb:
+        return 0.0
+    common = len(ta & tb)
+    if not common:
+        return 0.0
+    precision, recall = common / len(ta), common / len(tb)
+    return 2 * precision * recall / (precision + recall)
+
+
+def chapters_for(fixture, window: int) -> List[dict]:
+    analysis = chapter_service.ChapterAnalysis(merge_segments(fixture["snippets"], window=window))
+    return chapter_service.build_chapters(analysis.boundaries, analysis.sentences, analysis.vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 30, 60, 120])
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--stub-llm", action="store_true")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="with --stub-llm")
+    parser.add_argument("--fake-embeddings", action="store_true")
+    args = parser.parse_args()
+
+    stubbed = args.stub_llm or not os.getenv("GEMINI_API_KEY")
+    if stubbed:
+        gemini.client = StubLLM(args.llm_latency)
+    if args.fake_embeddings:
+        chapter_service.model = FakeEncoder()
+
+    rows = []
+    for fixture in pipeline_fixtures(args.minutes):
+        chapters = chapters_for(fixture, args.window)
+        metadata = {"title": fixture["title"]}
+
+        start = time.perf_counter()
+        keywords = chapter_service.keyword_titles(chapters, metadata)
+        keyword_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        llm = chapter_service.generate_chapter_titles(chapters, metadata)
+        llm_s = time.perf_counter() - start
+
+        overlap = sum(token_f1(a, b) for a, b in zip(keywords, llm)) / max(len(chapters), 1)
+        rows.append({
+            "fixture": fixture["name"],
+            "video_id": fixture["video_id"],
+            "minutes": fixture["minutes"],
+            "chapters": len(chapters),
+            "keywords_ms": round(keyword_s * 1000, 2),
+            "llm_ms": round(llm_s * 1000, 1),
+            "speedup": round(llm_s / keyword_s, 1) if keyword_s else float("inf"),
+            "overlap_f1": "n/a" if stubbed else round(overlap, 3),
+        })
+
+    print_table(rows)
+    if stubbed:
+        print("LLM stubbed (no GEMINI_API_KEY or --stub-llm): overlap not reported")
+
+
+if __name__ == "__main__":
+    main()
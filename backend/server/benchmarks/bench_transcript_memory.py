@@ -0,0 +1,64 @@
+"""Memory of a 5-hour transcript as Python dicts vs the columnar Transcript.
+
+Run from backend/server:
+
+    python -m benchmarks.bench_transcript_memory --hours 5
+"""
+import argparse
+import gc
+import tracemalloc
+
+from app.utils.transcript import Transcript
+from benchmarks.common import print_table, synthetic_snippets
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, peak
+
+
+def row(name, n, current, peak):
+    return {
+        "representation": name,
+        "segments": n,
+        "retained_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "bytes_per_segment": round(current / max(n, 1), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=5.0)
+    args = parser.parse_args()
+
+    source = [
+        (s["text"], s["start"], s["duration"])
+        for s in synthetic_snippets(args.hours * 3600)
+    ]
+    n = len(source)
+
+    # fresh str/float objects, as a JSON decode or API client would produce
+    dicts, current, peak = measure(lambda: [
+        {"text": text.encode().decode(), "start": start + 0.0, "duration": duration + 0.0}
+        for text, start, duration in source
+    ])
+    rows = [row("list[dict]", n, current, peak)]
+
+    transcript, current, peak = measure(lambda: Transcript.from_columns(
+        [start for _, start, _ in source],
+        [start + duration for _, start, duration in source],
+        [text for text, _, _ in source],
+    ))
+    rows.append(row("Transcript (columnar)", n, current, peak))
+
+    print_table(rows)
+    del dicts, transcript
+
+
+if __name__ == "__main__":
+    main()
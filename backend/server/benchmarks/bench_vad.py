@@ -0,0 +1,122 @@
+"""Audio skipped by VAD and the resulting Whisper speedup.
+
+Inputs are audio/video files (--audio, decoded with ffmpeg) or, by default,
+synthetic lectures: speech-like bursts with short pauses, an intro, a
+mid-session break and an outro of near-silence.
+
+Without --whisper the speedup is modelled from --rtf (Whisper's real-time
+factor): full_audio * rtf / (speech * rtf + vad_time). With --whisper each
+input is transcribed twice by the chosen tier, on the full audio and on the
+VAD cut, and the measured end-to-end times are compared.
+
+Run from backend/server:
+
+    python -m benchmarks.bench_vad --minutes 30 90
+    python -m benchmarks.bench_vad --audio lecture.mp3 --whisper --tier fast
+"""
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.utils import vad
+from app.utils.vad import SpeechAudio, speech_regions
+from benchmarks.common import print_table
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_lecture(minutes: float, seed: int = 0) -> np.ndarray:
+    """Talk stretches of 4 Hz amplitude-modulated noise (syllable-like),
+    0.2–0.8 s pauses between phrases, 0.5–3 s pauses between stretches, and
+    a 2 min intro, 5 min break and 1 min outro of room noise."""
+    rng = np.random.default_rng(seed)
+
+    def noise(seconds: float) -> np.ndarray:
+        return rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.002
+
+    def phrase(seconds: float) -> np.ndarray:
+        n = int(seconds * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t + rng.uniform(0, np.pi))
+        return rng.standard_normal(n) * 0.1 * envelope + noise(seconds)
+
+    def talk(seconds: float) -> List[np.ndarray]:
+        parts, t = [], 0.0
+        while t < seconds:
+            length = rng.uniform(1.5, 6)
+            parts.append(phrase(length))
+            gap = rng.uniform(0.2, 0.8) if rng.random() < 0.85 else rng.uniform(0.5, 3)
+            parts.append(noise(gap))
+            t += length + gap
+        return parts
+
+    body = max(minutes - 8, 1) * 60
+    parts = [noise(120), *talk(body / 2), noise(300), *talk(body / 2), noise(60)]
+    return np.concatenate(parts).astype(np.float32)
+
+
+def load_inputs(args) -> List[Dict]:
+    if args.audio:
+        from app.services.whisper_service import load_audio
+        return [{"name": path, "audio": load_audio(path)} for path in args.audio]
+    return [
+        {"name": f"synthetic {m:g} min", "audio": synthetic_lecture(m, seed=i)}
+        for i, m in enumerate(args.minutes)
+    ]
+
+
+def transcribe_seconds(audio: np.ndarray, tier: str) -> float:
+    from app.services import whisper_service
+
+    task, language = ("transcribe", "en") if tier == "fast" else ("translate", None)
+    start = time.perf_counter()
+    whisper_service.run_tier(tier, audio, task, language)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--audio", nargs="+", help="audio/video files instead of synthetic input")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[30, 90])
+    parser.add_argument("--rtf", type=float, default=0.15, help="modelled Whisper real-time factor")
+    parser.add_argument("--whisper", action="store_true", help="measure with the real model")
+    parser.add_argument("--tier", default="fast", choices=("fast", "standard", "accurate"))
+    args = parser.parse_args()
+
+    print(f"detector: {'webrtcvad' if vad.webrtcvad is not None else 'energy'}")
+    if args.whisper:
+        from app.services import whisper_service
+        whisper_service.load_model(whisper_service.TIERS[args.tier])
+
+    rows = []
+    for item in load_inputs(args):
+        audio = item["audio"]
+        start = time.perf_counter()
+        speech = SpeechAudio(audio, speech_regions(audio, SAMPLE_RATE), SAMPLE_RATE)
+        vad_s = time.perf_counter() - start
+
+        row = {
+            "input": item["name"],
+            "audio_s": round(speech.original_seconds, 1),
+            "speech_s": round(speech.speech_seconds, 1),
+            "skipped_pct": round(100 * speech.skipped_seconds / max(speech.original_seconds, 1e-9), 1),
+            "vad_ms": round(vad_s * 1000, 1),
+        }
+        if args.whisper:
+            full_s = transcribe_seconds(audio, args.tier)
+            cut_s = vad_s + transcribe_seconds(speech.audio, args.tier)
+            row.update({"full_s": round(full_s, 1), "vad_total_s": round(cut_s, 1)})
+            row["speedup"] = round(full_s / cut_s, 2)
+        else:
+            full_s = speech.original_seconds * args.rtf
+            cut_s = speech.speech_seconds * args.rtf + vad_s
+            row["modelled_speedup"] = round(full_s / cut_s, 2)
+        rows.append(row)
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
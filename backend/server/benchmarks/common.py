@@ -0,0 +1,152 @@
+import csv
+import math
+import os
+import random
+import re
+from typing import Dict, List
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_CSV = os.path.join(
+    SERVER_DIR, "..", "training_data", "dataset", "dataset", "dataset_metadata.csv"
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(name: str, seconds: List[float]) -> Dict:
+    ms = [s * 1000 for s in seconds]
+    return {
+        "name": name,
+        "n": len(ms),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "mean_ms": round(sum(ms) / len(ms), 2) if ms else float("nan"),
+    }
+
+
+def print_table(rows: List[Dict]):
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def load_dataset_videos(limit: int = 0) -> List[Dict]:
+    """Rows of the training dataset metadata (video_id, title, ...)."""
+    with open(DATASET_CSV, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return rows[:limit] if limit else rows
+
+
+_WORDS = (
+    "so today we are going to look at how the database stores rows in pages "
+    "and why an index lets the query planner skip most of them um you know "
+    "this is basically the key idea behind every relational system okay let "
+    "me show you an example with a users table and a simple select query"
+).split()
+
+
+def synthetic_snippets(duration_seconds: float, seed: int = 0) -> List[Dict]:
+    """YouTube-like caption snippets: 1–5 s long, 6–14 words, some sentence ends."""
+    rng = random.Random(seed)
+    snippets = []
+    t = 0.0
+    while t < duration_seconds:
+        duration = round(rng.uniform(1.0, 5.0), 2)
+        words = rng.choices(_WORDS, k=rng.randint(6, 14))
+        text = " ".join(words)
+        if rng.random() < 0.3:
+            text += "."
+        snippets.append({"text": text, "start": round(t, 2), "duration": duration})
+        t += duration
+    return snippets
+
+
+# =========================
+# PIPELINE FIXTURES
+# =========================
+FIXTURE_MINUTES = (10, 30, 60, 120, 300)
+
+
+# A real recorded caption track (~354 min): "M:SS text" lines at each
+# caption start, and "M:SS" lines with no text where a caption ends.
+CAPTIONS_FILE = os.path.join(SERVER_DIR, "..", "transcript.txt")
+CAPTIONS_VIDEO_ID = "26ls5lNiijk"
+# more tracks in the same format, one per video: captions/<video_id>.txt
+CAPTIONS_DIR = os.path.join(SERVER_DIR, "benchmarks", "captions")
+
+_CAPTION_LINE = re.compile(r"^(\d+):(\d{2})\s?(.*)$")
+
+
+def load_captions(path: str = CAPTIONS_FILE) -> List[Dict]:
+    """YouTube-shaped snippets (text/start/duration) from a caption file."""
+    marks = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            match = _CAPTION_LINE.match(line.strip())
+            if match:
+                marks.append((int(match.group(1)) * 60 + int(match.group(2)), match.group(3).strip()))
+
+    snippets = []
+    for i, (start, text) in enumerate(marks):
+        if not text:
+            continue
+        end = marks[i + 1][0] if i + 1 < len(marks) else start
+        snippets.append({"text": text, "start": float(start), "duration": float(max(end - start, 0))})
+    return snippets
+
+
+def caption_tracks() -> List[Dict]:
+    """The bundled track plus any in CAPTIONS_DIR, as video_id/path."""
+    tracks = [{"video_id": CAPTIONS_VIDEO_ID, "path": CAPTIONS_FILE}]
+    if os.path.isdir(CAPTIONS_DIR):
+        for name in sorted(os.listdir(CAPTIONS_DIR)):
+            if name.endswith(".txt"):
+                tracks.append({"video_id": name[:-4], "path": os.path.join(CAPTIONS_DIR, name)})
+    return tracks
+
+
+def pipeline_fixtures(minutes=FIXTURE_MINUTES) -> List[Dict]:
+    """Transcripts of several lengths from real caption tracks, so
+    chaptering sees real topic structure.
+
+    Every track is cut to each length in `minutes` it is long enough for
+    (its first N minutes); a track shorter than the longest length is also
+    used whole, so short videos in CAPTIONS_DIR appear as themselves.
+    Fixtures are named <video_id>/<N>min and sorted by length.
+    """
+    titles = {r["video_id"]: r["video_title"] for r in load_dataset_videos()}
+
+    fixtures = []
+    for track in caption_tracks():
+        captions = load_captions(track["path"])
+        if not captions:
+            continue
+        available = (captions[-1]["start"] + captions[-1]["duration"]) / 60
+
+        cuts = [(f"{m:g}min", m) for m in sorted(minutes) if m <= available]
+        if available < max(minutes):
+            cuts.append(("full", available))
+        for label, length in cuts:
+            fixtures.append({
+                "name": f"{track['video_id']}/{label}",
+                "video_id": track["video_id"],
+                "title": titles.get(track["video_id"], ""),
+                "minutes": round(length, 1),
+                "snippets": [s for s in captions if s["start"] < length * 60],
+            })
+
+    if not fixtures:
+        raise SystemExit(f"No caption track is long enough for {sorted(minutes)} min fixtures")
+    return sorted(fixtures, key=lambda f: (f["minutes"], f["name"]))
@@ -0,0 +1,90 @@
+"""Local stand-ins for YouTube, Whisper, the embedding model and Gemini.
+
+Each fake sleeps for a configurable latency (time.sleep releases the GIL
+like the real network and model calls do) and returns payloads shaped
+like the real ones, so the app can be driven without network or models.
+"""
+import re
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import synthetic_snippets
+
+
+class StubLLM:
+    """Stands in for the Gemini client: one title line per requested chapter."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.models = self
+
+    def generate_content(self, model: str, contents: str):
+        if self.latency:
+            time.sleep(self.latency)
+        match = re.search(r"Generate exactly (\d+) chapter titles", contents)
+        count = int(match.group(1)) if match else 1
+        return SimpleNamespace(text="\n".join(f"Stub title {i + 1}" for i in range(count)))
+
+
+class FakeEncoder:
+    """SentenceTransformer stand-in: deterministic unit vectors per text.
+
+    Costs `seconds_per_1k` for every 1000 texts encoded.
+    """
+
+    def __init__(self, seconds_per_1k: float = 0.0, dim: int = 384):
+        self.seconds_per_1k = seconds_per_1k
+        self.dim = dim
+
+    def encode(self, texts: List[str], show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        if self.seconds_per_1k:
+            time.sleep(self.seconds_per_1k * len(texts) / 1000)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            rng = np.random.default_rng(zlib.crc32(text.encode()))
+            vec = rng.standard_normal(self.dim).astype(np.float32)
+            out[i] = vec / np.linalg.norm(vec)
+        return out
+
+
+class FakeProviders:
+    """Transcript, Whisper and metadata providers with set latency and size.
+
+    `whisper_every` makes every Nth video have no YouTube transcript, so
+    those requests take the Whisper fallback (0 disables it).
+    """
+
+    def __init__(
+        self,
+        transcript_minutes: float = 30,
+        fetch_latency: float = 0.2,
+        whisper_latency: float = 5.0,
+        metadata_latency: float = 0.05,
+        whisper_every: int = 0,
+    ):
+        self.fetch_latency = fetch_latency
+        self.whisper_latency = whisper_latency
+        self.metadata_latency = metadata_latency
+        self.whisper_every = whisper_every
+        self.snippets = synthetic_snippets(transcript_minutes * 60)
+
+    def _has_captions(self, video_id: str) -> bool:
+        return not self.whisper_every or zlib.crc32(video_id.encode()) % self.whisper_every
+
+    def fetch_youtube_transcript(self, video_id: str, on_progress=None):
+        time.sleep(self.fetch_latency)
+        if not self._has_captions(video_id):
+            return None
+        return [dict(s) for s in self.snippets]
+
+    def whisper_transcribe(self, video_id: str, on_progress=None) -> List[Dict]:
+        time.sleep(self.whisper_latency)
+        return [dict(s) for s in self.snippets]
+
+    def get_video_metadata(self, url: str, use_cache: bool = True) -> Dict:
+        time.sleep(self.metadata_latency)
+        return {"title": "Benchmark video", "description": "", "thumbnail": "", "duration": 0}
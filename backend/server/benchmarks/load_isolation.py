@@ -0,0 +1,104 @@
+"""Show that a burst of Whisper jobs no longer blocks metadata lookups.
+
+YouTube transcripts are stubbed as unavailable so every /youtube/transcript
+request falls back to a fake Whisper job that blocks for --whisper-seconds;
+metadata lookups block for --metadata-seconds. Both release the GIL like the
+real calls do. Each mode fires the Whisper burst, then measures metadata
+latency while the burst is running:
+
+  isolated  separate I/O and model executors (current layout)
+  shared    one pool of the same total size for everything (old layout,
+            where every sync route shared Starlette's threadpool)
+
+Run from backend/server (imports the app, so models load once):
+
+    python -m benchmarks.load_isolation --whisper-jobs 40 --metadata-calls 50
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.core import executors
+from app.core.config import IO_WORKERS, MODEL_WORKERS
+from app.main import app
+from app.api.routes import youtube as youtube_routes
+from app.services import transcript_service
+from benchmarks.common import print_table, summarize
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def install_fakes(whisper_seconds: float, metadata_seconds: float):
+    def fake_fetch(video_id, on_progress=None):
+        return None
+
+    def fake_whisper(video_id, on_progress=None):
+        time.sleep(whisper_seconds)
+        return [{"text": "hello", "start": 0.0, "duration": 1.0}]
+
+    def fake_metadata(url, use_cache=True):
+        time.sleep(metadata_seconds)
+        return {"title": "t", "description": "", "thumbnail": "", "duration": 1}
+
+    transcript_service.fetch_youtube_transcript = fake_fetch
+    transcript_service.whisper_transcribe = fake_whisper
+    youtube_routes.get_video_metadata = fake_metadata
+
+
+async def run_mode(mode: str, whisper_jobs: int, metadata_calls: int):
+    transcript_service.transcript_cache.clear()
+
+    if mode == "shared":
+        shared = ThreadPoolExecutor(max_workers=IO_WORKERS + MODEL_WORKERS)
+        executors.io_executor = executors.model_executor = shared
+    else:
+        executors.io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS)
+        executors.model_executor = ThreadPoolExecutor(max_workers=MODEL_WORKERS)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        burst = [
+            asyncio.create_task(client.post("/youtube/transcript", json={"url": VIDEO_URL}))
+            for _ in range(whisper_jobs)
+        ]
+        # let the burst occupy the pools before measuring
+        await asyncio.sleep(0.2)
+
+        async def timed_metadata():
+            start = time.perf_counter()
+            response = await client.post("/youtube/metadata", json={"url": VIDEO_URL})
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        latencies = await asyncio.gather(*(timed_metadata() for _ in range(metadata_calls)))
+
+        for task in burst:
+            task.cancel()
+        await asyncio.gather(*burst, return_exceptions=True)
+
+    executors.io_executor.shutdown(wait=False, cancel_futures=True)
+    executors.model_executor.shutdown(wait=False, cancel_futures=True)
+    return summarize(f"metadata during whisper burst ({mode})", list(latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--whisper-jobs", type=int, default=40)
+    parser.add_argument("--metadata-calls", type=int, default=50)
+    parser.add_argument("--whisper-seconds", type=float, default=5.0)
+    parser.add_argument("--metadata-seconds", type=float, default=0.05)
+    args = parser.parse_args()
+
+    install_fakes(args.whisper_seconds, args.metadata_seconds)
+
+    rows = []
+    for mode in ("shared", "isolated"):
+        rows.append(asyncio.run(run_mode(mode, args.whisper_jobs, args.metadata_calls)))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
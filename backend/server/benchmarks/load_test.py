@@ -0,0 +1,224 @@
+"""Mixed-traffic load test of app.main:app with local stand-ins.
+
+Boots the real app in-process (httpx ASGI transport) with the providers
+from benchmarks.fakes installed: YouTube captions, Whisper, metadata, the
+embedding model and Gemini. Latencies and transcript size are flags, so the
+same run can model "everything cached and fast" or "slow YouTube + Whisper
+fallbacks".
+
+Traffic is a weighted mix of /youtube/transcript, the segmented SSE stream
+and /youtube/chapters, issued by --concurrency clients. Video ids are drawn
+from --videos distinct ids, so a small pool exercises the transcript cache
+and a large one mostly misses it.
+
+Reports throughput, p50/p95/p99 per endpoint and, sampled every
+--sample-ms, how busy the I/O and model executors were and how much work
+was queued behind them.
+
+Run from backend/server:
+
+    python -m benchmarks.load_test --requests 500 --concurrency 32 \\
+        --mix transcript=5,stream=3,chapters=2 --whisper-every 10
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+import httpx
+
+from app.core import executors
+from app.main import app
+from app.api.routes import youtube as youtube_routes
+from app.services import chapter_service, transcript_service
+from app.utils import gemini
+from app.utils.transcript_merger import merge_segments
+from benchmarks.common import print_table, summarize
+from benchmarks.fakes import FakeEncoder, FakeProviders, StubLLM
+
+ENDPOINTS = ("transcript", "stream", "chapters")
+
+
+def install_fakes(args) -> FakeProviders:
+    providers = FakeProviders(
+        transcript_minutes=args.transcript_minutes,
+        fetch_latency=args.fetch_latency,
+        whisper_latency=args.whisper_latency,
+        metadata_latency=args.metadata_latency,
+        whisper_every=args.whisper_every,
+    )
+    transcript_service.fetch_youtube_transcript = providers.fetch_youtube_transcript
+    transcript_service.whisper_transcribe = providers.whisper_transcribe
+    youtube_routes.get_video_metadata = providers.get_video_metadata
+    gemini.client = StubLLM(args.llm_latency)
+    if not args.real_embeddings:
+        chapter_service.model = FakeEncoder(args.encode_seconds_per_1k)
+    return providers
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# =========================
+# EXECUTOR SAMPLING
+# =========================
+def executor_load(pool) -> tuple:
+    """(busy workers, queued tasks) of a ThreadPoolExecutor.
+
+    Reads CPython's private fields; good enough for a benchmark.
+    """
+    idle = pool._idle_semaphore._value
+    busy = max(len(pool._threads) - idle, 0)
+    return busy, pool._work_queue.qsize()
+
+
+async def sample_executors(samples: Dict[str, List[tuple]], interval: float, stop: asyncio.Event):
+    while not stop.is_set():
+        samples["io"].append(executor_load(executors.io_executor))
+        samples["model"].append(executor_load(executors.model_executor))
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def saturation_rows(samples: Dict[str, List[tuple]]) -> List[Dict]:
+    workers = {
+        "io": executors.io_executor._max_workers,
+        "model": executors.model_executor._max_workers,
+    }
+    rows = []
+    for name, points in samples.items():
+        if not points:
+            continue
+        busy = [b for b, _ in points]
+        queued = [q for _, q in points]
+        rows.append({
+            "executor": name,
+            "workers": workers[name],
+            "mean_busy": round(sum(busy) / len(busy), 1),
+            "max_busy": max(busy),
+            "mean_queue": round(sum(queued) / len(queued), 1),
+            "max_queue": max(queued),
+            # share of samples with every worker busy and work waiting
+            "saturated_pct": round(100 * sum(q > 0 for q in queued) / len(queued), 1),
+        })
+    return rows
+
+
+# =========================
+# TRAFFIC
+# =========================
+async def call(client: httpx.AsyncClient, endpoint: str, video_id: str, chapters_body: Dict):
+    url = f"https://www.youtube.com/watch?v={video_id}"
+
+    if endpoint == "transcript":
+        response = await client.post("/youtube/transcript", json={"url": url})
+        response.raise_for_status()
+        return
+
+    if endpoint == "chapters":
+        response = await client.post("/youtube/chapters", json=chapters_body)
+        response.raise_for_status()
+        return
+
+    async with client.stream(
+        "POST", "/youtube/transcript/segmented/stream", json={"url": url}
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if '"type": "error"' in line:
+                raise RuntimeError(line)
+            if '"type": "done"' in line:
+                return
+
+
+async def run(args, mix: Dict[str, float], chapters_body: Dict):
+    rng = random.Random(args.seed)
+    names, weights = list(mix), list(mix.values())
+    plan = [
+        (rng.choices(names, weights)[0], f"vid{rng.randrange(args.videos):08d}")
+        for _ in range(args.requests)
+    ]
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    samples: Dict[str, List[tuple]] = {"io": [], "model": []}
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def worker():
+            while not queue.empty():
+                endpoint, video_id = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    await call(client, endpoint, video_id, chapters_body)
+                    latencies[endpoint].append(time.perf_counter() - start)
+                except Exception:
+                    errors[endpoint] += 1
+
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_executors(samples, args.sample_ms / 1000, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+        stop.set()
+        await sampler
+
+    return latencies, errors, samples, wall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default="transcript=5,stream=3,chapters=2")
+    parser.add_argument("--videos", type=int, default=1000, help="distinct video ids")
+    parser.add_argument("--transcript-minutes", type=float, default=30)
+    parser.add_argument("--fetch-latency", type=float, default=0.2)
+    parser.add_argument("--metadata-latency", type=float, default=0.05)
+    parser.add_argument("--whisper-latency", type=float, default=5.0)
+    parser.add_argument("--whisper-every", type=int, default=0, help="every Nth video needs Whisper")
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--encode-seconds-per-1k", type=float, default=0.5)
+    parser.add_argument("--real-embeddings", action="store_true")
+    parser.add_argument("--sample-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    providers = install_fakes(args)
+    transcript_service.transcript_cache.clear()
+    mix = parse_mix(args.mix)
+
+    chapters_body = {
+        "transcriptSegments": merge_segments(providers.snippets, window=60),
+        "metadata": {"title": "Benchmark video", "description": ""},
+    }
+
+    latencies, errors, samples, wall = asyncio.run(run(args, mix, chapters_body))
+
+    rows = []
+    for name in mix:
+        row = summarize(name, latencies[name])
+        row["errors"] = errors[name]
+        rows.append(row)
+    done = sum(len(v) for v in latencies.values())
+    print(f"{done} ok, {sum(errors.values())} failed in {wall:.1f}s → {done / wall:.1f} req/s")
+    print_table(rows)
+    print()
+    print_table(saturation_rows(samples))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from app.utils import changepoint
+from app.utils.changepoint import ChangePoints
+
+
+def blocks(lengths, dim=16, noise=0.05, seed=0):
+    """Vectors around one random direction per block, 10 s per item."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((len(lengths), dim))
+    vectors = np.concatenate([
+        center + noise * rng.standard_normal((n, dim)) for center, n in zip(centers, lengths)
+    ])
+    times = np.arange(len(vectors)) * 10.0
+    edges = np.cumsum(lengths)[:-1].tolist()
+    return vectors, times, edges
+
+
+def build(vectors, times, min_seconds=30.0, max_splits=50):
+    end = float(times[-1]) + 10.0 if len(times) else 0.0
+    return ChangePoints(vectors, times, end, min_seconds=min_seconds, max_splits=max_splits)
+
+
+def test_finds_block_edges():
+    vectors, times, edges = blocks([20, 35, 12, 40])
+
+    assert build(vectors, times).boundaries(4) == edges
+
+
+def test_coarser_segmentations_nest_in_finer_ones():
+    vectors, times, _ = blocks([15, 30, 10, 25, 20, 18], seed=1)
+    cp = build(vectors, times)
+
+    for k in range(1, 8):
+        assert set(cp.boundaries(k)) <= set(cp.boundaries(k + 1))
+        assert len(cp.boundaries(k)) == k - 1
+
+
+def test_every_recorded_split_removes_cost():
+    vectors, times, _ = blocks([15, 30, 10, 25], seed=2)
+
+    splits = build(vectors, times).splits
+
+    assert splits and all(gain > 0 for _, gain in splits)
+    assert len({t for t, _ in splits}) == len(splits)
+
+
+def test_min_seconds_is_respected():
+    vectors, times, _ = blocks([3, 40, 2, 30], seed=3)
+
+    cp = build(vectors, times, min_seconds=60.0)
+    edges = [0, *cp.boundaries(cp.max_segments), len(vectors)]
+    bounds = np.append(times, times[-1] + 10.0)
+
+    assert len(edges) > 2
+    assert all(bounds[b] - bounds[a] >= 60.0 for a, b in zip(edges, edges[1:]))
+
+
+def test_more_segments_than_possible():
+    vectors, times, edges = blocks([8, 8], seed=4)
+
+    cp = build(vectors, times, min_seconds=50.0)
+
+    assert cp.boundaries(100) == cp.boundaries(cp.max_segments)
+    assert edges[0] in cp.boundaries(2)
+
+
+def test_identical_vectors_have_nothing_to_split():
+    vectors = np.ones((30, 8))
+    times = np.arange(30) * 10.0
+
+    cp = build(vectors, times)
+
+    assert cp.splits == []
+    assert cp.boundaries(5) == []
+
+
+@pytest.mark.parametrize("vectors", [np.zeros((0, 8)), np.zeros((0, 0))])
+def test_empty_input(vectors):
+    cp = ChangePoints(vectors, [], 0.0, min_seconds=30.0, max_splits=10)
+
+    assert cp.splits == []
+    assert cp.max_segments == 1
+    assert cp.boundaries(3) == []
+
+
+def test_chunked_gains_match_a_direct_evaluation(monkeypatch):
+    vectors, times, _ = blocks([40, 25, 60, 30], dim=24, noise=0.4, seed=5)
+    whole = build(vectors, times, max_splits=20).splits
+
+    # more chunks than candidate rows in every segment
+    monkeypatch.setattr(changepoint, "SPLIT_CHUNK", 7)
+    chunked = build(vectors, times, max_splits=20).splits
+
+    assert [t for t, _ in chunked] == [t for t, _ in whole]
+    np.testing.assert_allclose([g for _, g in chunked], [g for _, g in whole])
+
+    # the first split against a brute-force sum of squared errors
+    x = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def sse(part):
+        return float(((part - part.mean(axis=0)) ** 2).sum()) if len(part) else 0.0
+
+    t, gain = whole[0]
+    assert gain == pytest.approx(sse(x) - sse(x[:t]) - sse(x[t:]))
@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.profiling import SamplingProfiler, active_profiler
+from app.schemas.youtube import Metadata
+from app.services import chapter_service
+from app.utils import gemini
+from app.utils.transcript_merger import merge_segments
+from benchmarks.common import synthetic_snippets
+from benchmarks.fakes import FakeEncoder, StubLLM
+
+
+@pytest.fixture
+def segments():
+    return merge_segments(synthetic_snippets(20 * 60), window=60)
+
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    monkeypatch.setattr(chapter_service, "model", FakeEncoder())
+    monkeypatch.setattr(gemini, "client", StubLLM())
+    chapter_service.analysis_cache.clear()
+    yield
+    chapter_service.analysis_cache.clear()
+
+
+def test_pydantic_metadata_reaches_keyword_titles(segments, monkeypatch):
+    seen = []
+    keyword_titles = chapter_service.keyword_titles
+
+    def spy(chapters, metadata):
+        seen.append(metadata)
+        return keyword_titles(chapters, metadata)
+
+    monkeypatch.setattr(chapter_service, "keyword_titles", spy)
+    metadata = Metadata(title="Database indexes", description="An intro to indexes")
+
+    chapters = chapter_service.generate_chapters(segments, metadata, title_mode="keywords")
+
+    assert seen and seen[0]["title"] == "Database indexes"
+    assert chapters and all(c["title"] for c in chapters)
+
+
+def test_description_chapters_skip_titles(segments):
+    metadata = Metadata(title="Database indexes", description="0:00 Intro\n4:10 B-trees")
+
+    chapters = chapter_service.generate_chapters(segments, metadata)
+
+    assert chapters and not any("title" in c for c in chapters)
+
+
+def test_concurrent_requests_encode_once(segments, monkeypatch):
+    encoder = FakeEncoder()
+    calls = []
+    encode = encoder.encode
+
+    def counting_encode(texts, **kwargs):
+        calls.append(len(texts))
+        return encode(texts, **kwargs)
+
+    class SlowAnalysis(chapter_service.ChapterAnalysis):
+        # widen the window between a cache miss and the cache insert
+        def __init__(self, segments):
+            time.sleep(0.05)
+            super().__init__(segments)
+
+    monkeypatch.setattr(encoder, "encode", counting_encode)
+    monkeypatch.setattr(chapter_service, "model", encoder)
+    monkeypatch.setattr(chapter_service, "ChapterAnalysis", SlowAnalysis)
+
+    barrier = threading.Barrier(4)
+
+    def request(mode):
+        barrier.wait()
+        return chapter_service.generate_chapters(segments, {"title": "x"}, title_mode=mode)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(request, ["keywords", "llm", "keywords", "llm"]))
+
+    assert len(calls) == 1
+    assert all(results)
+
+
+def test_target_chapters_reuse_one_segmentation(segments, monkeypatch):
+    built = []
+    change_points = chapter_service.ChangePoints
+
+    def spy(*args, **kwargs):
+        built.append(kwargs["max_splits"])
+        return change_points(*args, **kwargs)
+
+    monkeypatch.setattr(chapter_service, "ChangePoints", spy)
+
+    for target in (2, 4, 3):
+        chapters = chapter_service.generate_chapters(
+            segments, {"title": "x"}, title_mode="keywords", target_chapters=target
+        )
+        assert 1 <= len(chapters) <= target
+
+    assert built == [chapter_service.CHANGEPOINT_MAX_SPLITS]
+
+
+def test_keyword_titles_see_whole_chapter_text(segments, monkeypatch):
+    seen = []
+    keyword_titles = chapter_service.keyword_titles
+
+    def spy(chapters, metadata):
+        seen.append([c["text"] for c in chapters])
+        return keyword_titles(chapters, metadata)
+
+    monkeypatch.setattr(chapter_service, "keyword_titles", spy)
+
+    chapters = chapter_service.generate_chapters(segments, {"title": "x"}, title_mode="keywords")
+
+    sentences = chapter_service.analyze_transcript(segments).sentences
+    assert seen[0] == [c["text"] for c in chapters]
+    assert " ".join(c["text"] for c in chapters) == sentences.join_text(0, len(sentences))
+    for c in chapters:
+        assert 1 <= len(c["key_sentences"]) <= chapter_service.KEY_SENTENCES
+        assert all(s in c["text"] for s in c["key_sentences"])
+
+
+def test_profiled_request_samples_title_batch_threads(monkeypatch):
+    monkeypatch.setattr(gemini, "client", StubLLM(latency=0.1))
+    chapters = [{"start": 60.0 * i, "end": 60.0 * (i + 1), "text": "indexes"} for i in range(3)]
+
+    profiler = SamplingProfiler(interval=0.005)
+    token = active_profiler.set(profiler)
+    profiler.start()
+    try:
+        titles = chapter_service.generate_chapter_titles(chapters, {"title": "x"})
+    finally:
+        active_profiler.reset(token)
+        profiler.stop()
+
+    assert titles == ["Stub title 1", "Stub title 2", "Stub title 3"]
+    assert any("_request_titles" in stack for stack in profiler.samples)
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.utils.transcript import Transcript
+from benchmarks.common import synthetic_snippets
+
+
+def test_from_segments_accepts_dicts_and_snippet_objects():
+    snippets = synthetic_snippets(5 * 60)
+    objects = [SimpleNamespace(**s) for s in snippets]
+
+    from_dicts = Transcript.from_segments(snippets)
+    from_objects = Transcript.from_segments(objects)
+
+    assert len(from_dicts) == len(snippets)
+    assert from_dicts.texts() == from_objects.texts() == [s["text"] for s in snippets]
+    assert from_dicts.start.tolist() == [s["start"] for s in snippets]
+    assert from_dicts.end.tolist() == [s["start"] + s["duration"] for s in snippets]
+    assert np.array_equal(from_dicts.end, from_objects.end)
+
+
+def test_whisper_segments_keep_their_end_times():
+    segments = [
+        {"start": 0.0, "end": 2.5, "text": " Hello"},
+        {"start": 2.5, "end": 4.0, "text": " there"},
+    ]
+
+    transcript = Transcript.from_segments(segments)
+
+    assert transcript.to_dicts() == segments
+
+
+def test_unsorted_segments_are_sorted_by_start():
+    transcript = Transcript.from_columns([5.0, 1.0, 3.0], [6.0, 2.0, 4.0], ["c", "a", "b"])
+
+    assert transcript.texts() == ["a", "b", "c"]
+    assert transcript.start.tolist() == [1.0, 3.0, 5.0]
+    assert transcript.end.tolist() == [2.0, 4.0, 6.0]
+
+
+def test_times_are_not_rounded_on_the_way_in():
+    # float32 would turn this into 7200.009765625
+    transcript = Transcript.from_columns([7200.01], [7201.0], ["x"])
+
+    assert transcript.start[0] == 7200.01
+    assert transcript.start.dtype == np.float64
+
+
+def test_slices_share_text_addressing():
+    transcript = Transcript.from_columns([0, 1, 2, 3], [1, 2, 3, 4], ["zero", "one", "", "three"])
+
+    section = transcript[1:4]
+
+    assert section.texts() == ["one", "", "three"]
+    assert section.text(2) == "three"
+    assert transcript.join_text(0, 2) == "zero one"
+    assert len(transcript[3:1]) == 0
+
+
+def test_to_dicts_with_duration_round_trips_youtube_shape():
+    snippets = synthetic_snippets(60)
+
+    assert Transcript.from_segments(snippets).to_dicts(duration=True) == snippets
+
+
+def test_empty_transcript():
+    transcript = Transcript.from_segments([])
+
+    assert len(transcript) == 0
+    assert transcript.texts() == []
+    assert transcript.to_dicts() == []
+    assert transcript.duration == 0.0
+
+
+# =========================
+# TIME RANGES
+# =========================
+def lecture():
+    # 0-4, 4-9, 9-15, 15-16, 20-30 (a gap at 16-20)
+    return Transcript.from_columns(
+        [0.0, 4.0, 9.0, 15.0, 20.0],
+        [4.0, 9.0, 15.0, 16.0, 30.0],
+        ["a", "b", "c", "d", "e"],
+    )
+
+
+def test_range_is_segments_starting_inside_it():
+    transcript = lecture()
+
+    assert transcript.time_range(4.0, 15.0).texts() == ["b", "c"]
+    assert transcript.time_range(0.0, 30.0).texts() == ["a", "b", "c", "d", "e"]
+
+
+def test_segment_straddling_the_range_start_is_left_out():
+    # "b" runs 4-9 but starts before 5
+    assert lecture().time_range(5.0, 16.0).texts() == ["c", "d"]
+
+
+def test_segment_straddling_the_range_end_is_kept():
+    # "c" starts at 9 and runs past 10
+    assert lecture().time_range(4.0, 10.0).texts() == ["b", "c"]
+
+
+def test_adjacent_ranges_tile_without_repeats():
+    transcript = lecture()
+    edges = [0.0, 4.5, 9.0, 17.0, 31.0]
+
+    tiled = [t for a, b in zip(edges, edges[1:]) for t in transcript.time_range(a, b).texts()]
+
+    assert tiled == transcript.texts()
+
+
+def test_empty_ranges():
+    transcript = lecture()
+
+    assert len(transcript.time_range(16.5, 19.0)) == 0    # inside the gap
+    assert len(transcript.time_range(31.0, 60.0)) == 0    # past the end
+    assert len(transcript.time_range(9.0, 9.0)) == 0      # zero width
+    assert len(transcript.time_range(15.0, 4.0)) == 0     # reversed
+    assert transcript.time_range(16.5, 19.0).to_dicts() == []
+    assert len(Transcript.empty().time_range(0.0, 10.0)) == 0
+
+
+def test_range_matches_a_linear_scan():
+    snippets = synthetic_snippets(30 * 60, seed=3)
+    transcript = Transcript.from_segments(snippets)
+
+    for t0, t1 in [(0, 60), (59.5, 61), (123.45, 600), (1799, 2000)]:
+        expected = [s["text"] for s in snippets if t0 <= s["start"] < t1]
+        assert transcript.time_range(t0, t1).texts() == expected
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.transcript import Transcript
+from app.utils.transcript_merger import (
+    format_transcript_with_punctuation,
+    merge_segments,
+    normalize_transcript_text,
+)
+from benchmarks.common import synthetic_snippets
+
+
+def reference_merge(segments, window):
+    """merge_segments as it was over lists of dicts, before Transcript."""
+    if not segments:
+        return []
+
+    def emit(bucket, bucket_start, bucket_end):
+        return {
+            "start": round(bucket_start, 2),
+            "end": round(bucket_end, 2),
+            "text": format_transcript_with_punctuation(" ".join(bucket)),
+        }
+
+    merged, bucket = [], []
+    bucket_start = segments[0]["start"]
+    bucket_end = bucket_start + window
+    for seg in segments:
+        cleaned_text = normalize_transcript_text(seg["text"])
+        if seg["start"] <= bucket_end:
+            bucket.append(cleaned_text)
+        else:
+            merged.append(emit(bucket, bucket_start, bucket_end))
+            bucket_start = seg["start"]
+            bucket_end = bucket_start + window
+            bucket = [cleaned_text]
+    merged.append(emit(bucket, bucket_start, bucket_end))
+    return merged
+
+
+def with_gaps(snippets, every=40, gap=95.0):
+    """Shift later snippets so some windows are empty."""
+    shifted, offset = [], 0.0
+    for k, s in enumerate(snippets):
+        if k and k % every == 0:
+            offset += gap
+        shifted.append({**s, "start": round(s["start"] + offset, 2)})
+    return shifted
+
+
+@pytest.mark.parametrize("window", [1, 30, 60, 300])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_merge_matches_list_of_dicts_output(window, seed):
+    snippets = with_gaps(synthetic_snippets(30 * 60, seed=seed))
+
+    assert merge_segments(snippets, window=window) == reference_merge(snippets, window)
+
+
+def test_merge_accepts_snippet_objects_and_transcripts():
+    snippets = synthetic_snippets(10 * 60)
+    expected = reference_merge(snippets, 60)
+
+    assert merge_segments([SimpleNamespace(**s) for s in snippets], window=60) == expected
+    assert merge_segments(Transcript.from_segments(snippets), window=60) == expected
+
+
+def test_segment_on_the_window_end_stays_in_the_window():
+    snippets = [
+        {"text": "one", "start": 0.0, "duration": 1.0},
+        {"text": "two", "start": 60.0, "duration": 1.0},
+        {"text": "three", "start": 60.01, "duration": 1.0},
+    ]
+
+    merged = merge_segments(snippets, window=60)
+
+    assert merged == reference_merge(snippets, 60)
+    assert [m["text"] for m in merged] == ["One two.", "Three."]
+
+
+def test_merge_of_nothing_is_empty():
+    assert merge_segments([], window=60) == []
+
+
+@pytest.mark.parametrize("window", [0, -60])
+def test_non_positive_window_still_advances(window):
+    snippets = synthetic_snippets(60)
+
+    merged = merge_segments(snippets, window=window)
+
+    assert len(merged) == len(snippets)
+    assert [m["start"] for m in merged] == [s["start"] for s in snippets]
+
+
+def test_rebucketing_reuses_normalization():
+    transcript = Transcript.from_segments(synthetic_snippets(10 * 60))
+
+    merge_segments(transcript, window=60)
+    normalized = transcript.cached("normalized", lambda: None)
+
+    assert normalized is not None and None not in normalized
+    assert merge_segments(transcript, window=300) == reference_merge(
+        transcript.to_dicts(duration=True), 300
+    )
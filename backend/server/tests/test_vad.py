@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from app.utils import vad
+from app.utils.vad import SpeechAudio, speech_regions
+
+RATE = 16000
+
+
+def speech_audio(regions_seconds, total_seconds):
+    """SpeechAudio over silence with the given (start, end) regions kept."""
+    audio = np.zeros(int(total_seconds * RATE), dtype=np.float32)
+    regions = [(int(a * RATE), int(b * RATE)) for a, b in regions_seconds]
+    return SpeechAudio(audio, regions, RATE)
+
+
+@pytest.fixture
+def three_gaps():
+    # kept: 2-5, 10-12, 20-24, 30-31; removed: 0-2, 5-10, 12-20, 24-30, 31-40
+    return speech_audio([(2, 5), (10, 12), (20, 24), (30, 31)], 40)
+
+
+def test_durations(three_gaps):
+    assert three_gaps.original_seconds == 40
+    assert three_gaps.speech_seconds == 10
+    assert three_gaps.skipped_seconds == 30
+    assert len(three_gaps.audio) == 10 * RATE
+
+
+@pytest.mark.parametrize("cut, original", [
+    (0.0, 2.0),     # start of the first region, after the removed intro
+    (1.5, 3.5),
+    (3.0, 10.0),    # start of the second region
+    (4.5, 11.5),
+    (5.0, 20.0),    # start of the third region
+    (8.25, 23.25),
+    (9.0, 30.0),    # start of the last region
+    (9.5, 30.5),
+])
+def test_start_times_map_into_their_region(three_gaps, cut, original):
+    assert three_gaps.to_original(cut) == pytest.approx(original)
+
+
+def test_end_on_a_region_join_stays_in_the_earlier_region(three_gaps):
+    assert three_gaps.to_original(3.0, end=True) == pytest.approx(5.0)
+    assert three_gaps.to_original(5.0, end=True) == pytest.approx(12.0)
+    assert three_gaps.to_original(9.0, end=True) == pytest.approx(24.0)
+
+
+def test_times_past_the_cut_audio_clamp_to_the_last_region(three_gaps):
+    assert three_gaps.to_original(10.0, end=True) == pytest.approx(31.0)
+    assert three_gaps.to_original(12.0, end=True) == pytest.approx(31.0)
+
+
+def test_remap_segments_across_the_gaps(three_gaps):
+    segments = [
+        {"start": 0.0, "end": 3.0, "text": "a"},      # exactly the first region
+        {"start": 2.5, "end": 5.5, "text": "b"},      # spans the 5-10 and 12-20 gaps
+        {"start": 5.0, "end": 9.0, "text": "c"},      # exactly the third region
+        {"start": 9.2, "end": 10.0, "text": "d"},     # inside the last region
+    ]
+
+    remapped = three_gaps.remap(segments)
+
+    assert [(s["start"], s["end"]) for s in remapped] == pytest.approx(
+        [(2.0, 5.0), (4.5, 20.5), (20.0, 24.0), (30.2, 31.0)]
+    )
+    assert [s["text"] for s in remapped] == ["a", "b", "c", "d"]
+    assert all(s["end"] >= s["start"] for s in remapped)
+
+
+def test_no_regions():
+    speech = speech_audio([], 10)
+
+    assert speech.speech_seconds == 0
+    assert speech.skipped_seconds == 10
+    assert speech.to_original(1.0) == 1.0
+
+
+def test_speech_regions_find_bursts_in_silence(monkeypatch):
+    # the energy detector, whether or not webrtcvad is installed
+    monkeypatch.setattr(vad, "webrtcvad", None)
+    rng = np.random.default_rng(0)
+    audio = rng.standard_normal(30 * RATE).astype(np.float32) * 0.001
+    for a, b in [(3, 8), (15, 18), (24, 27)]:
+        audio[a * RATE:b * RATE] += rng.standard_normal((b - a) * RATE).astype(np.float32) * 0.2
+
+    regions = speech_regions(audio, RATE)
+
+    assert len(regions) == 3
+    for (start, end), (a, b) in zip(regions, [(3, 8), (15, 18), (24, 27)]):
+        assert start / RATE == pytest.approx(a, abs=0.5)
+        assert end / RATE == pytest.approx(b, abs=0.5)
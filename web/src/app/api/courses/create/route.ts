@@ -117,8 +117,11 @@ async function processCourse(
           );
         }
 
+        if (event.type === "segment") {
+          segments.push(event.segment);
+        }
+
         if (event.type === "done") {
-          segments = event.segments;
           break;
         }
 